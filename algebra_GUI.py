@@ -1,25 +1,27 @@
 # Run python ./algebra_GUI.py with main.py & solver.py in same folder for program to work
 
+import threading
 import tkinter as tk
 from tkinter import scrolledtext
 from main import generate_one_variable_problem, generate_two_variable_problem, generate_Calc_problem
-from solver import (
-    solve_algebra,
-    check_algebra_answer,
-    check_calc_answer,
-    algebra_steps,
-    calc_steps,
-)
+from prefetch import ProblemPrefetcher, algebra_key, calc_key
+from solver import ProblemSession
 
 # ==========================================================
 # App state
 # ==========================================================
 num_variables = None          # 1 or 2
 operation_type = None         # a/s, m/d, e/r, mixed
-current_problem = None        # problem string shown to user
-current_solution = None       # for calc problems
+session = None                # ProblemSession for the problem shown to user
 calc_kind = None              # derivative or integral 
 solve_for_var = None          # x or y for 2-variable problems
+problem_token = 0             # bumped on every new problem so stale results get dropped
+busy_jobs = 0                 # background jobs still running
+
+POLL_MS = 50                  # how often we look for finished background work
+
+# keeps a few solved problems ready for each problem type the user picks
+prefetcher = ProblemPrefetcher(depth=3)
 
 
 # Map GUI button labels
@@ -31,6 +33,58 @@ DIFFICULTY_MAP = {
 }
 
 
+# ---------- Background work ----------
+# SymPy can take seconds, so solver calls run on a worker thread and the
+# result is handed back on the Tk thread with root.after. Tk widgets are
+# only ever touched from the Tk thread.
+def next_problem_token():
+    """Mark any work still running for the old problem as stale."""
+    global problem_token
+    problem_token += 1
+
+
+def set_busy(delta: int):
+    global busy_jobs
+    busy_jobs += delta
+    busy = busy_jobs > 0
+    busy_label.config(text="Working…" if busy else "")
+    root.config(cursor="watch" if busy else "")
+
+
+def run_in_background(work, args, on_done):
+    """Run work(*args) off the Tk thread, then call on_done(result) on it.
+
+    If the user has moved on to another problem by the time it finishes,
+    the result is thrown away.
+    """
+    token = problem_token
+    box = {}
+
+    def target():
+        try:
+            box["result"] = work(*args)
+        except Exception as e:
+            box["error"] = e
+
+    worker = threading.Thread(target=target, daemon=True)
+    worker.start()
+    set_busy(+1)
+
+    def poll():
+        if worker.is_alive():
+            root.after(POLL_MS, poll)
+            return
+        set_busy(-1)
+        if token != problem_token:
+            return
+        if "error" in box:
+            result_label.config(text=f"Something went wrong: {box['error']}", fg="red")
+            return
+        on_done(box["result"])
+
+    root.after(POLL_MS, poll)
+
+
 # ---------- Navigation helper ----------
 def show_frame(frame):
     """Hide all frames and show the selected one."""
@@ -42,10 +96,11 @@ def show_frame(frame):
 # ---------- Selection functions ----------
 def choose_variables(n: int):
     """User chooses 1 or 2 variables."""
-    global num_variables, operation_type, current_problem
+    global num_variables, operation_type, session
+    next_problem_token()
     num_variables = n
     operation_type = None
-    current_problem = None
+    session = None
 
     entry_box.delete(0, tk.END)
     result_label.config(text="", fg="black")
@@ -55,20 +110,24 @@ def choose_variables(n: int):
 
 def choose_operation(op: str):
     """User chooses an operation type; generate + display a problem."""
-    global operation_type, current_problem
+    global operation_type, session
 
+    next_problem_token()
     operation_type = op
     difficulty = DIFFICULTY_MAP.get(op)
 
-    if num_variables == 1:
-        current_problem = generate_one_variable_problem(difficulty)
-    elif num_variables == 2:
-        current_problem = generate_two_variable_problem(difficulty)
-    else:
-        current_problem = None
-
-    if current_problem:
-        problem_value_label.config(text=current_problem)
+    session = None
+    if num_variables in (1, 2):
+        # a prefetched problem is already solved; otherwise make one now
+        session = prefetcher.get(algebra_key(num_variables, difficulty))
+        if session is None:
+            make = generate_one_variable_problem if num_variables == 1 else generate_two_variable_problem
+            problem = make(difficulty)
+            if problem:
+                session = ProblemSession(problem, num_variables)
+
+    if session:
+        problem_value_label.config(text=session.problem)
     else:
         problem_value_label.config(text="(couldn't generate a problem — try again)")
 
@@ -88,6 +147,7 @@ def choose_operation(op: str):
 def choose_type(kind: str):
     # user chooses algebra or calc
     global operation_type
+    next_problem_token()
     operation_type = kind
     entry_box.delete(0, tk.END)
     result_label.config(text="", fg="black")
@@ -100,23 +160,44 @@ def choose_type(kind: str):
 
 def choose_calc(kind: str):
     # user chooses derivative or integral
-    global current_problem, current_solution, calc_kind, operation_type
+    global session, calc_kind, operation_type
+    next_problem_token()
     calc_kind = kind
     operation_type = "Calculus"
+    session = None
     arg = 'D' if kind == 'Derivative' else 'I'
-    res = generate_Calc_problem(arg)
-    if res:
-        prob, sol = res
-        current_problem = prob
-        current_solution = sol
-        problem_value_label.config(text=current_problem)
-    else:
-        problem_value_label.config(text="(couldn't generate a problem — try again)")
+
+    problem_value_label.config(text="(generating a problem…)")
     entry_box.delete(0, tk.END)
     result_label.config(text="", fg="black")
     solve_for_selector.pack_forget()      # not needed for calculus
     show_frame(input_frame)
 
+    prepared = prefetcher.get(calc_key(arg))
+    if prepared:
+        show_calc_problem(prepared)
+    else:
+        run_in_background(new_calc_session, (arg, kind), show_calc_problem)
+
+
+def new_calc_session(arg, kind):
+    # runs on a worker thread
+    res = generate_Calc_problem(arg)
+    if not res:
+        return None
+    prob, sol = res
+    return ProblemSession(prob, solution=sol, calc_kind=kind)
+
+
+def show_calc_problem(new_session):
+    # called back on the Tk thread once the calculus problem is ready
+    global session
+    if new_session:
+        session = new_session
+        problem_value_label.config(text=session.problem)
+    else:
+        problem_value_label.config(text="(couldn't generate a problem — try again)")
+
 
 # ---------- Check answer ----------
 def get_entry_value():
@@ -126,21 +207,21 @@ def get_entry_value():
         result_label.config(text="Please enter an answer.", fg="#b8860b")
         return
 
-    if operation_type == "Calculus":
-        if current_solution is None:
+    if session is None:
+        if operation_type == "Calculus":
             result_label.config(text="No solution to check against.", fg="red")
-            return
-        is_correct, msg = check_calc_answer(user_input, current_solution)
-    else:
-        if current_problem is None:
+        else:
             result_label.config(text="No problem loaded.", fg="red")
-            return
-        # for 2-variable problems, pass the chosen target variable
-        target = solve_for_strvar.get() if (num_variables or 0) == 2 else None
-        is_correct, msg = check_algebra_answer(
-            current_problem, user_input, num_variables or 1, solve_for=target
-        )
+        return
+
+    # for 2-variable problems, pass the chosen target variable
+    target = solve_for_strvar.get() if (num_variables or 0) == 2 and not session.is_calculus else None
+    run_in_background(session.check, (user_input, target), show_feedback)
 
+
+def show_feedback(result):
+    # called back on the Tk thread with (is_correct, msg)
+    is_correct, msg = result
     if is_correct is True:
         result_label.config(text=msg, fg="green")
     elif is_correct is False:
@@ -152,19 +233,22 @@ def get_entry_value():
 # ---------- Show answer / steps ----------
 def show_answer():
     """Display the step-by-step solution in the solution frame."""
-    if current_problem is None:
+    if session is None:
         return
 
-    if operation_type == "Calculus":
-        if current_solution is None:
-            return
-        text = calc_steps(current_problem, current_solution, calc_kind or "Derivative")
+    target = solve_for_strvar.get() if (num_variables or 0) == 2 and not session.is_calculus else None
+    # steps for a prefetched problem (or one we showed before) are already there
+    text = session.cached_steps(target)
+    if text is not None:
+        show_steps(text)
     else:
-        target = solve_for_strvar.get() if (num_variables or 0) == 2 else None
-        text = algebra_steps(current_problem, num_variables or 1, solve_for=target)
+        run_in_background(session.steps, (target,), show_steps)
 
+
+def show_steps(text):
+    # called back on the Tk thread with the finished step text
     # also show the problem at the top of the solution frame
-    solution_problem_label.config(text=current_problem)
+    solution_problem_label.config(text=session.problem)
 
     solution_text.config(state=tk.NORMAL)
     solution_text.delete("1.0", tk.END)
@@ -188,11 +272,11 @@ def new_problem():
 
 # ---------- Reset ----------
 def reset_app():
-    global num_variables, operation_type, current_problem, current_solution, calc_kind
+    global num_variables, operation_type, session, calc_kind
+    next_problem_token()
     num_variables = None
     operation_type = None
-    current_problem = None
-    current_solution = None
+    session = None
     calc_kind = None
 
     entry_box.delete(0, tk.END)
@@ -292,6 +376,10 @@ entry_box.pack(pady=8)
 result_label = tk.Label(input_frame, text="", font=("Arial", 12), wraplength=560, justify="center")
 result_label.pack(pady=(0, 8))
 
+# busy indicator while the solver works in the background
+busy_label = tk.Label(input_frame, text="", font=("Arial", 10, "italic"), fg="gray")
+busy_label.pack()
+
 # --- button row 1: Submit / Show Answer ---
 btn_row1 = tk.Frame(input_frame)
 btn_row1.pack(pady=4)
@@ -0,0 +1,4 @@
+"""Benchmarks for the problem generators and solver.py.
+
+Run a script from the repo root, e.g.  python -m benchmarks.bench_solve
+"""
@@ -0,0 +1,71 @@
+"""Compare calculus problem generation with the rule tables against sp.diff / sp.integrate.
+
+Both sides draw the same problems from the same seed; the old path is a
+copy of generate_Calc_problem from before the rule tables, kept here for
+comparison.
+
+Usage:  python -m benchmarks.bench_calc_gen [--count N] [--seed S]
+"""
+
+import argparse
+import random
+import time
+
+import sympy as sp
+
+import main
+
+
+def legacy_generate_Calc_problem(CalcType, rng):
+    """generate_Calc_problem as it was before the rule tables."""
+    x = sp.symbols('x')
+
+    def random_polynomial(max_deg=3):
+        deg = rng.randint(1, max_deg)
+        coeffs = [rng.randint(-5, 5) for _ in range(deg + 1)]
+        return sum(coeffs[i] * x**i for i in range(deg + 1))
+
+    def random_trig():
+        a, b = sp.Integer(rng.randint(1, 5)), sp.Integer(rng.randint(1, 3))
+        c, d = sp.Integer(rng.randint(1, 5)), sp.Integer(rng.randint(1, 3))
+        return a * sp.sin(b * x) + c * sp.cos(d * x)
+
+    def random_exp_log():
+        a, b = sp.Integer(rng.randint(1, 4)), sp.Integer(rng.randint(1, 3))
+        expr = a * sp.exp(b * x)
+        if rng.choice([True, False]):
+            expr = expr + sp.Integer(rng.randint(1, 3)) * sp.log(x)
+        return expr
+
+    f = rng.choice([random_polynomial, random_trig, random_exp_log])()
+    if CalcType == 'D':
+        return f"Differentiate: {f}", sp.diff(f, x)
+    return f"Integrate: {f}", sp.integrate(f, x)
+
+
+def _time(make, kind, count, seed):
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    out = [make(kind, rng) for _ in range(count)]
+    return time.perf_counter() - start, out
+
+
+def run(count: int = 500, seed: int = 1):
+    main.generate_Calc_problem("D", random.Random(0))      # load SymPy before timing anything
+    for kind, label in (("D", "derivatives"), ("I", "integrals")):
+        old_time, old = _time(legacy_generate_Calc_problem, kind, count, seed)
+        new_time, new = _time(main.generate_Calc_problem, kind, count, seed)
+        same = sum(a == b for a, b in zip(old, new))
+
+        print(f"{label}  ({count} problems, {same} identical to the SymPy answers)")
+        print(f"  sp.diff / sp.integrate: {count / old_time:9.0f} problems/s")
+        print(f"  rule tables:            {count / new_time:9.0f} problems/s")
+        print(f"  speed-up:               {old_time / new_time:9.1f}x")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--count", type=int, default=500)
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+    run(args.count, args.seed)
@@ -0,0 +1,71 @@
+"""Compare mathparse with the old regex rewrite + sp.sympify parsing path.
+
+Usage:  python -m benchmarks.bench_parse [--count N] [--seed S]
+"""
+
+import argparse
+import re
+import time
+
+import sympy as sp
+
+import mathparse
+from benchmarks.corpus import algebra_corpus
+
+
+def legacy_preprocess(eq_str: str) -> str:
+    """The regex chain solver.py used before mathparse (kept for comparison)."""
+    s = eq_str.strip()
+    s = re.sub(r"√(\d+)", r"sqrt(\1)", s)
+    s = s.replace("^", "**")
+    s = re.sub(r"(\d)([a-zA-Z])", r"\1*\2", s)
+    s = re.sub(r"\)([a-zA-Z0-9])", r")*\1", s)
+    for bad in ("s*q*r*t", "s*qrt", "sq*rt", "sqr*t"):
+        s = s.replace(bad, "sqrt")
+    return s
+
+
+def legacy_parse(side: str):
+    names = [ch for ch in dict.fromkeys(side) if ch.isalpha()]
+    local_dict = {**{v: sp.Symbol(v) for v in names}, "sqrt": sp.sqrt}
+    return sp.sympify(legacy_preprocess(side), locals=local_dict)
+
+
+def equation_sides(count: int, seed: int) -> list[str]:
+    """Both sides of about count corpus problems (count is spread over its 8 kinds)."""
+    sides = []
+    for problem, _, _ in algebra_corpus(max(1, count // 8), seed):
+        sides.extend(problem.split("=", 1))
+    return sides
+
+
+def _time(parse, sides):
+    ok = 0
+    start = time.perf_counter()
+    for side in sides:
+        try:
+            parse(side)
+            ok += 1
+        except Exception:
+            pass
+    return time.perf_counter() - start, ok
+
+
+def run(count: int = 1000, seed: int = 1):
+    sides = equation_sides(count, seed)
+    legacy_parse(sides[0])      # load SymPy before timing anything
+    old_time, old_ok = _time(legacy_parse, sides)
+    new_time, new_ok = _time(mathparse.parse_expr, sides)
+
+    print(f"corpus:           {len(sides)} equation sides")
+    print(f"regex + sympify:  {old_time * 1e3:9.2f} ms  ({old_ok} parsed)")
+    print(f"mathparse:        {new_time * 1e3:9.2f} ms  ({new_ok} parsed)")
+    print(f"speed-up:         {old_time / new_time:9.1f}x")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--count", type=int, default=1000)
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+    run(args.count, args.seed)
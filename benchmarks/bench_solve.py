@@ -0,0 +1,57 @@
+"""Compare the closed-form fast path in solver.py with plain sp.solve.
+
+Usage:  python -m benchmarks.bench_solve [--count N] [--seed S]
+"""
+
+import argparse
+import time
+
+import sympy as sp
+
+import solver
+from benchmarks.corpus import algebra_corpus
+
+
+def _time(fn, items):
+    start = time.perf_counter()
+    out = [fn(eq, target) for eq, target in items]
+    return time.perf_counter() - start, out
+
+
+def run(count: int = 400, seed: int = 1):
+    items = []
+    # count is spread over the 8 (variables, difficulty) kinds
+    for problem, _, solve_for in algebra_corpus(max(1, count // 8), seed):
+        eq, syms = solver._parse_equation(problem)
+        if eq is None:
+            continue
+        target = sp.Symbol(solve_for) if solve_for else (syms[0] if len(syms) == 1 else None)
+        if target is not None:
+            items.append((eq, target))
+
+    fast_time, fast = _time(solver._fast_solve, items)
+    handled = [(item, sols) for item, sols in zip(items, fast) if sols is not None]
+    covered = [item for item, _ in handled]
+    slow_time, slow = _time(lambda eq, t: sp.solve(eq, t, dict=True), covered)
+
+    mismatches = 0
+    for (_, sols), ref in zip(handled, slow):
+        # the same expressions, not just equal values, and in the same order:
+        # the printed form and order are what users see in the answer and steps
+        if sols != ref:
+            mismatches += 1
+
+    print(f"corpus:          {len(items)} equations ({len(covered)} linear/quadratic)")
+    print(f"fast path total: {fast_time * 1e3:9.2f} ms  (includes the misses)")
+    print(f"sp.solve total:  {slow_time * 1e3:9.2f} ms  (covered equations only)")
+    if fast_time:
+        print(f"speed-up:        {slow_time / fast_time:9.1f}x")
+    print(f"mismatches:      {mismatches}")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--count", type=int, default=400)
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+    run(args.count, args.seed)
@@ -0,0 +1,92 @@
+"""Measure how long it takes to import the app's modules (and whether SymPy loads).
+
+Each scenario runs in a fresh interpreter with `python -X importtime`, so the
+numbers include everything the import pulls in. Results are appended to
+benchmarks/results/startup.jsonl so they can be compared run to run.
+
+Usage:  python -m benchmarks.bench_startup [--repeat N] [--no-save]
+"""
+
+import argparse
+import json
+import os
+import pathlib
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+HISTORY = ROOT / "benchmarks" / "results" / "startup.jsonl"
+
+# name -> code to run; each prints whether SymPy got imported along the way
+SCENARIOS = {
+    "import main": "import main",
+    "import solver": "import solver",
+    "import prefetch": "import prefetch",
+    "generate A/S problem": "import main; main.generate_one_variable_problem('as')",
+    "check A/S answer": "import solver; solver.check_algebra_answer('x + 3 = 5', '2', 1)",
+    "first SymPy solve": "import solver; solver.solve_algebra('x^2 = 4')",
+}
+_PROBE = "; import sys; print('sympy' in sys.modules)"
+
+
+def _run_once(code: str):
+    """(total microseconds from -X importtime, wall seconds, sympy loaded?)"""
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code + _PROBE],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    wall = time.perf_counter() - start
+
+    # lines look like: "import time:  self [us] | cumulative | imported package"
+    # top-level imports have no leading spaces before the package name
+    total_us = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name.startswith("  "):
+            total_us += int(cumulative)
+    return total_us, wall, proc.stdout.strip().endswith("True")
+
+
+def run(repeat: int = 5, save: bool = True) -> dict:
+    results = {}
+    for name, code in SCENARIOS.items():
+        runs = [_run_once(code) for _ in range(repeat)]
+        results[name] = {
+            "import_ms": round(statistics.median(r[0] for r in runs) / 1000, 2),
+            "wall_ms": round(statistics.median(r[1] for r in runs) * 1000, 2),
+            "loads_sympy": runs[0][2],
+        }
+
+    print(f"{'scenario':24} {'imports (ms)':>13} {'wall (ms)':>10}  sympy?")
+    for name, r in results.items():
+        print(f"{name:24} {r['import_ms']:13.1f} {r['wall_ms']:10.1f}  {'yes' if r['loads_sympy'] else 'no'}")
+
+    if save:
+        HISTORY.parent.mkdir(parents=True, exist_ok=True)
+        record = {"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "commit": _git_rev(),
+                  "python": sys.version.split()[0], "results": results}
+        with open(HISTORY, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+        print(f"\nappended to {os.path.relpath(HISTORY, ROOT)}")
+    return results
+
+
+def _git_rev() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--no-save", action="store_true", help="don't append to the history file")
+    args = ap.parse_args()
+    run(args.repeat, save=not args.no_save)
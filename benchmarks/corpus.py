@@ -0,0 +1,60 @@
+"""The fixed, seeded problem corpus every benchmark runs on.
+
+Problems come straight from the main.py generators: every difficulty, one
+and two variables, derivatives and integrals. Each (kind, difficulty) pair
+gets its own seeded RNG, so adding a kind doesn't shift the others.
+"""
+
+import random
+
+import sympy as sp
+
+import main
+from mathparse import parse_equation
+
+DIFFICULTIES = ["addition/subtraction", "multiplication/division",
+                "exponents/roots", "mixed"]
+
+# Some "mixed" problems like x^-9 + 8/x = x^2 turn into very high degree
+# polynomials and keep sp.solve busy for tens of seconds. They'd swamp
+# every timing, so the corpus leaves them out.
+MAX_DEGREE = 4
+
+
+def _tractable(problem: str) -> bool:
+    try:
+        lhs, rhs, syms = parse_equation(problem)
+        numer = sp.together(lhs - rhs).as_numer_denom()[0]
+        poly = sp.Poly(numer, *syms) if syms else None
+    except (ValueError, sp.PolynomialError):
+        return True     # not a polynomial; sp.solve either copes or gives up fast
+    return poly is None or poly.total_degree() <= MAX_DEGREE
+
+
+def algebra_corpus(per_kind: int = 25, seed: int = 1) -> list[tuple[str, int, str | None]]:
+    """(problem, num_variables, solve_for) for each difficulty and variable count."""
+    corpus = []
+    for num_variables in (1, 2):
+        make = (main.generate_one_variable_problem if num_variables == 1
+                else main.generate_two_variable_problem)
+        solve_for = None if num_variables == 1 else "x"
+        for difficulty in DIFFICULTIES:
+            rng = random.Random(f"{seed}-{num_variables}-{difficulty}")
+            made = 0
+            while made < per_kind:
+                problem = make(difficulty, rng)
+                if problem and _tractable(problem):
+                    corpus.append((problem, num_variables, solve_for))
+                    made += 1
+    return corpus
+
+
+def calc_corpus(per_kind: int = 25, seed: int = 1) -> list[tuple[str, sp.Expr, str]]:
+    """(problem, solution, calc_kind) for derivatives and integrals."""
+    corpus = []
+    for calc_type, kind in (("D", "Derivative"), ("I", "Integral")):
+        rng = random.Random(f"{seed}-calc-{calc_type}")
+        for _ in range(per_kind):
+            problem, solution = main.generate_Calc_problem(calc_type, rng)
+            corpus.append((problem, solution, kind))
+    return corpus
@@ -0,0 +1,156 @@
+"""Load-test server.py over localhost with keep-alive connections.
+
+Each connection sends one request at a time, back to back, for --duration
+seconds. We report requests and items per second, the median and p99
+latency, and how many requests were turned away with 503.
+
+Usage:
+  python -m benchmarks.load_test --spawn --workers 4 --endpoint check --batch 20
+  python -m benchmarks.load_test --port 8765 --endpoint solve --connections 64
+
+--spawn starts its own server on a free port and stops it afterwards;
+without it, point --host/--port at one that's already running.
+"""
+
+import argparse
+import asyncio
+import json
+import socket
+import subprocess
+import sys
+import time
+
+import main
+from benchmarks.corpus import algebra_corpus
+from benchmarks.run import _summary
+
+
+def build_items(endpoint: str, count: int, seed: int) -> list[dict]:
+    """Request items for endpoint, cycled through by the clients."""
+    if endpoint == "generate":
+        return [{"kind": "algebra", "difficulty": "mixed", "count": 10, "seed": seed + i}
+                for i in range(count)]
+    if endpoint == "check":
+        keyed = main.generate_problems_with_answers(count, "mixed", seed)
+        return [{"problem": p, "answer": ", ".join(str(a) for a in answers)}
+                for p, answers in keyed]
+    corpus = algebra_corpus(max(1, count // 8), seed)
+    return [{"problem": p, "num_variables": n, "solve_for": s} for p, n, s in corpus]
+
+
+async def _request(reader, writer, path: str, body: bytes) -> int:
+    writer.write(f"POST {path} HTTP/1.1\r\nHost: localhost\r\n"
+                 f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+                 .encode("latin-1") + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while (line := await reader.readline()) not in (b"\r\n", b""):
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def _client(host, port, path, bodies, offset, deadline, results):
+    reader, writer = await asyncio.open_connection(host, port)
+    i = offset
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            status = await _request(reader, writer, path, bodies[i % len(bodies)])
+            results.append((status, time.perf_counter() - start))
+            i += 1
+    finally:
+        writer.close()
+
+
+async def _load(host, port, endpoint, items, batch, connections, duration):
+    if batch > 1:
+        bodies = [json.dumps({"items": [items[(i + j) % len(items)] for j in range(batch)]})
+                  for i in range(0, len(items), batch)]
+    else:
+        bodies = [json.dumps(item) for item in items]
+    bodies = [b.encode("utf-8") for b in bodies]
+
+    results: list[tuple[int, float]] = []
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(_client(host, port, f"/{endpoint}", bodies, c * 7, deadline, results)
+                           for c in range(connections)))
+    return results, time.perf_counter() - start
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_until_up(host: str, port: int, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection((host, port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"server didn't come up on {host}:{port}")
+
+
+def run(endpoint: str = "check", batch: int = 1, connections: int = 16,
+        duration: float = 10.0, host: str = "127.0.0.1", port: int = 8765,
+        spawn: bool = False, workers: int | None = None, queue: int = 64,
+        seed: int = 1) -> dict:
+    items = build_items(endpoint, 400, seed)
+    server = None
+    if spawn:
+        port = _free_port()
+        cmd = [sys.executable, "server.py", "--host", host, "--port", str(port),
+               "--queue", str(queue)]
+        if workers:
+            cmd += ["--workers", str(workers)]
+        server = subprocess.Popen(cmd)
+        _wait_until_up(host, port)
+
+    try:
+        results, elapsed = asyncio.run(_load(host, port, endpoint, items, batch,
+                                             connections, duration))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    ok = [t for status, t in results if status == 200]
+    busy = sum(1 for status, _ in results if status == 503)
+    failed = len(results) - len(ok) - busy
+    print(f"{endpoint}: {len(results)} requests over {connections} connections "
+          f"in {elapsed:.1f}s (batch {batch})")
+    print(f"  {len(ok) / elapsed:.1f} req/s, {len(ok) * batch / elapsed:.1f} items/s")
+    print(f"  503 busy: {busy}   other errors: {failed}")
+    summary = _summary(ok) if ok else {}
+    if ok:
+        print(f"  latency median {summary['median_ms']:.1f} ms, p99 {summary['p99_ms']:.1f} ms")
+    return {"requests": len(results), "ok": len(ok), "busy": busy, "failed": failed,
+            "seconds": round(elapsed, 3), **summary}
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--spawn", action="store_true", help="start a server for the test")
+    ap.add_argument("--workers", type=int, help="pool processes for a spawned server")
+    ap.add_argument("--queue", type=int, default=64, help="queue limit for a spawned server")
+    ap.add_argument("--endpoint", choices=["generate", "solve", "check", "steps"],
+                    default="check")
+    ap.add_argument("--batch", type=int, default=1, help="items per request")
+    ap.add_argument("--connections", type=int, default=16)
+    ap.add_argument("--duration", type=float, default=10.0, help="seconds")
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+    result = run(args.endpoint, args.batch, args.connections, args.duration, args.host,
+                 args.port, args.spawn, args.workers, args.queue, args.seed)
+    sys.exit(0 if result["ok"] and not result["failed"] else 1)
@@ -0,0 +1,166 @@
+"""Time every hot path in the app on the fixed corpus and save the results.
+
+Stages: parse, solve, check (correct / partial / wrong answers), calculus
+check, algebra steps and calculus steps. Each reports the median and p99
+latency per item. The in-memory solver caches are cleared before each stage
+and the disk cache is switched off, so every number is a cold first call.
+
+Usage:
+  python -m benchmarks.run --out bench.json
+  python -m benchmarks.run --compare bench.json --threshold 1.25
+
+With --compare, the run fails (exit code 1) if any stage's median is more
+than threshold times slower than in the saved results.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+import solver
+from benchmarks.corpus import algebra_corpus, calc_corpus
+
+
+def _answers_for(problem: str, num_variables: int, solve_for: str | None) -> dict:
+    """Correct, partial and wrong answers for a problem (partial only if there is one)."""
+    sols = solver.solve_algebra(problem, solve_for=solve_for)
+    values = [str(v) for d in sols for v in d.values()]
+    if not values:
+        return {}
+    if num_variables == 2:
+        return {"correct": f"{solve_for} = {values[0]}", "wrong": f"{solve_for} = 12345"}
+    answers = {"correct": ", ".join(values), "wrong": "12345"}
+    if len(values) > 1:
+        answers["partial"] = values[0]
+    return answers
+
+
+def _time_each(calls) -> list[float]:
+    """Seconds taken by each zero-argument call."""
+    timings = []
+    for call in calls:
+        start = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def _summary(timings: list[float]) -> dict:
+    ordered = sorted(timings)
+    p99 = ordered[min(len(ordered) - 1, int(0.99 * len(ordered)))]
+    return {
+        "n": len(ordered),
+        "median_ms": round(statistics.median(ordered) * 1e3, 4),
+        "p99_ms": round(p99 * 1e3, 4),
+        "mean_ms": round(statistics.fmean(ordered) * 1e3, 4),
+    }
+
+
+def _cold(stage_calls):
+    solver.clear_parse_cache()
+    solver.clear_solution_cache()
+    solver.clear_term_cache()
+    return _time_each(stage_calls)
+
+
+def run(per_kind: int = 25, seed: int = 1) -> dict:
+    # SOLVER_CACHE turns the disk cache on at import; we'd be timing SQLite hits
+    solver.disable_disk_cache()
+    algebra = algebra_corpus(per_kind, seed)
+    calc = calc_corpus(per_kind, seed)
+
+    # answers are worked out up front so they aren't part of any timing
+    answers = [(_answers_for(p, n, sf), p, n, sf) for p, n, sf in algebra]
+    solver.solve_algebra("x^2 = 4")     # load SymPy before timing anything
+
+    stages = {
+        "parse": [lambda p=p: solver._parse_equation(p) for p, _, _ in algebra],
+        "solve": [lambda p=p, sf=sf: solver.solve_algebra(p, solve_for=sf)
+                  for p, _, sf in algebra],
+    }
+    for which in ("correct", "partial", "wrong"):
+        stages[f"check_{which}"] = [
+            lambda p=p, a=a[which], n=n, sf=sf: solver.check_algebra_answer(p, a, n, solve_for=sf)
+            for a, p, n, sf in answers if which in a
+        ]
+    stages["check_calc_correct"] = [lambda s=s: solver.check_calc_answer(str(s), s)
+                                    for _, s, _ in calc]
+    stages["check_calc_wrong"] = [lambda s=s: solver.check_calc_answer("12345*x", s)
+                                  for _, s, _ in calc]
+    stages["algebra_steps"] = [lambda p=p, n=n, sf=sf: solver.algebra_steps(p, n, solve_for=sf)
+                               for p, n, sf in algebra]
+    stages["calc_steps"] = [lambda p=p, s=s, k=k: solver.calc_steps(p, s, k) for p, s, k in calc]
+
+    results = {}
+    for name, calls in stages.items():
+        if calls:
+            results[name] = _summary(_cold(calls))
+            print(f"{name:20} n={results[name]['n']:4}  median {results[name]['median_ms']:9.3f} ms"
+                  f"  p99 {results[name]['p99_ms']:9.3f} ms", flush=True)
+
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": _git_rev(),
+        "python": sys.version.split()[0],
+        "seed": seed,
+        "per_kind": per_kind,
+        "stages": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """Names of stages whose median got slower than threshold x baseline."""
+    slower = []
+    print(f"\n{'stage':20} {'baseline':>10} {'now':>10} {'ratio':>7}")
+    for name, now in current["stages"].items():
+        before = baseline.get("stages", {}).get(name)
+        if not before or not before["median_ms"]:
+            continue
+        ratio = now["median_ms"] / before["median_ms"]
+        flag = "  << slower" if ratio > threshold else ""
+        print(f"{name:20} {before['median_ms']:10.3f} {now['median_ms']:10.3f} {ratio:7.2f}{flag}")
+        if ratio > threshold:
+            slower.append(name)
+    return slower
+
+
+def _git_rev() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmark the generator/solver hot paths.")
+    ap.add_argument("--per-kind", type=int, default=25,
+                    help="problems per (variables, difficulty) and per calculus kind")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--out", help="write the results to this JSON file")
+    ap.add_argument("--compare", metavar="BASELINE", help="JSON results from an earlier run")
+    ap.add_argument("--threshold", type=float, default=1.25,
+                    help="fail if a stage's median is this many times slower (default 1.25)")
+    args = ap.parse_args(argv)
+
+    current = run(args.per_kind, args.seed)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+        print(f"\nsaved {args.out}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        slower = compare(current, baseline, args.threshold)
+        if slower:
+            print(f"\nREGRESSION: {', '.join(slower)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
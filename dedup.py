@@ -0,0 +1,119 @@
+# dedup.py — spot generated problems that are the same equation written differently
+#
+# The generators draw from small ranges and shuffle operands, so a big batch
+# is full of repeats like "x + 3 = 5" / "3 + x = 5" / "5 = x + 3". Each
+# problem gets a cheap signature (no SymPy), and a set of signatures tells
+# us in O(1) whether we've already handed that equation out.
+#
+#   linear equations   each side as exact coefficients, both scaled so the
+#                      first variable's coefficient is 1 ("2x + 6 = 10" ==
+#                      "x + 3 = 5", but not "x + 1 = 3")
+#   everything else    each side's terms, sorted, with the factors of plain
+#                      products sorted too
+#
+# Either way the two sides go in sorted order, so "a = b" matches "b = a".
+
+from linear import parse_linear
+from mathparse import ParseError, as_tokens
+
+__all__ = ["signature", "DedupIndex"]
+
+
+def signature(problem) -> tuple:
+    """A hashable key that's equal for trivially equivalent equations.
+
+    problem can be text or a Problem.
+    """
+    try:
+        tokens = as_tokens(problem)
+    except ParseError:
+        tokens = []
+    if tokens.count("=") != 1:
+        return ("text", " ".join(str(problem).split()))
+    split = tokens.index("=")
+    lhs, rhs = tokens[:split], tokens[split + 1:]
+
+    sides = _linear_sides(lhs, rhs)
+    if sides is not None:
+        return ("linear",) + sides
+    return ("terms",) + tuple(sorted((_side_key(lhs), _side_key(rhs)), key=repr))
+
+
+def _linear_sides(lhs: list, rhs: list) -> tuple | None:
+    """Both sides as linear forms scaled by a common factor, or None."""
+    forms = (parse_linear(lhs), parse_linear(rhs))
+    if None in forms:
+        return None
+    variables = sorted(k for form in forms for k in form if k)
+    if not variables:
+        return None
+    lead = next(form[variables[0]] for form in forms if variables[0] in form)
+    scaled = [tuple(sorted((k, v / lead) for k, v in form.items())) for form in forms]
+    return tuple(sorted(scaled))
+
+
+def _is_operand_end(tok) -> bool:
+    # after one of these, + and - are binary operators rather than signs
+    return isinstance(tok, int) or tok == ")" or tok[0].isalnum() or tok[0] == "."
+
+
+def _side_key(tokens: list) -> tuple:
+    """The side's terms as (sign, factors) pairs, in a fixed order."""
+    terms = []
+    sign, current, depth, prev = 1, [], 0, None
+    for tok in tokens:
+        if tok == "(":
+            depth += 1
+        elif tok == ")":
+            depth -= 1
+        if depth == 0 and tok in ("+", "-") and prev is not None and _is_operand_end(prev):
+            terms.append((sign, _term_key(current)))
+            sign, current = (1 if tok == "+" else -1), []
+        else:
+            current.append(tok)
+        prev = tok
+    terms.append((sign, _term_key(current)))
+    return tuple(sorted(terms, key=repr))
+
+
+def _term_key(tokens: list) -> tuple:
+    # a plain product like 3*x*y doesn't care about order; anything with
+    # /, ^, √ or parentheses is kept as written
+    if any(t in ("/", "^", "√", "(") for t in tokens if isinstance(t, str)):
+        return tuple(tokens)
+    factors, current = [], []
+    for tok in tokens:
+        if tok == "*":
+            factors.append(tuple(current))
+            current = []
+        else:
+            current.append(tok)
+    factors.append(tuple(current))
+    return ("*",) + tuple(sorted(factors, key=repr))
+
+
+class DedupIndex:
+    """A set of problems that compares them by signature.
+
+    key turns an item into its signature; the default handles problem
+    strings and Problems. For (problem, solution) calculus pairs, pass
+    something like key=lambda pair: pair[0].
+    """
+
+    def __init__(self, key=signature):
+        self.key = key
+        self._seen: set = set()
+
+    def add(self, item) -> bool:
+        """Remember item; True if it's new, False if we'd already seen its equation."""
+        sig = self.key(item)
+        if sig in self._seen:
+            return False
+        self._seen.add(sig)
+        return True
+
+    def __contains__(self, item) -> bool:
+        return self.key(item) in self._seen
+
+    def __len__(self) -> int:
+        return len(self._seen)
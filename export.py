@@ -0,0 +1,178 @@
+# export.py — stream worksheets (problems + answer keys) to JSONL or CSV
+#
+# Everything is a generator pipeline: problems come out of main.py's seeded
+# generators one at a time, get solved (in a process pool with --workers),
+# and are written in buffered chunks. Nothing holds on to the whole set, so
+# memory stays flat however many problems you ask for.
+#
+#   python export.py -n 10000 --kind algebra --level mixed --out sheet.jsonl
+#   python export.py -n 500 --kind calc --level I --format csv --steps --out calc.csv
+
+import argparse
+import csv
+import io
+import json
+import sys
+import time
+from functools import partial
+
+from main import iter_Calc_problems, iter_problems, iter_problems_with_answers
+from solver import algebra_steps, calc_steps, format_solutions, run_many, solve_algebra
+
+__all__ = ["FIELDS", "iter_worksheet", "write_jsonl", "write_csv", "export"]
+
+# columns in every record; "steps" is added when steps are asked for
+FIELDS = ["id", "kind", "level", "problem", "answer"]
+
+_BUFFER_RECORDS = 256      # records per write() call
+_CHUNK = 8                 # records per pool job with workers > 1
+
+
+def iter_worksheet(n: int, kind: str = "algebra", level: str = "mixed", variables: int = 1,
+                   seed: int | None = None, steps: bool = False,
+                   timeout: float | None = None, unique: bool = False,
+                   from_answer: bool = False, workers: int = 1):
+    """Yield n worksheet records (dicts with FIELDS, plus "steps" if asked).
+
+    For algebra, level is a difficulty like "mixed" or "as" and variables
+    is 1 or 2 (2-variable problems are solved for x). For calculus, level
+    is 'D' or 'I'. timeout is a per-problem budget for the solver; a
+    problem that runs out of time gets an empty answer. unique=True skips
+    repeats of an equation already in the worksheet. from_answer=True
+    (one-variable algebra only) builds each problem around a known answer,
+    so the answer key needs no solver at all. workers > 1 solves the
+    answer keys and steps in that many processes; problems are still made
+    in order from the one seed, so the worksheet comes out the same.
+    """
+    # calculus and answer-first problems come with their answers, so they
+    # only need the solver (and the pool) for steps
+    solving = steps
+    if kind == "calc":
+        source = iter_Calc_problems(n, level, seed, unique)
+        task = partial(_calc_record, level=level, steps=steps, timeout=timeout)
+    elif from_answer:
+        source = iter_problems_with_answers(n, level, seed, structured=True, unique=unique)
+        task = partial(_keyed_record, level=level, steps=steps, timeout=timeout)
+    else:
+        source = iter_problems(n, level, variables, seed, structured=True, unique=unique)
+        task = partial(_algebra_record, level=level, variables=variables, steps=steps,
+                       timeout=timeout)
+        solving = True
+    return run_many(task, enumerate(source), workers if solving else 1, _CHUNK)
+
+
+def _calc_record(item, level, steps, timeout):
+    i, (problem, solution) = item
+    record = {"id": i, "kind": "calc", "level": level, "problem": problem,
+              "answer": str(solution)}
+    if steps:
+        calc_kind = "Derivative" if level == "D" else "Integral"
+        record["steps"] = calc_steps(problem, solution, calc_kind, timeout=timeout)
+    return record
+
+
+def _keyed_record(item, level, steps, timeout):
+    i, (problem, answers) = item
+    record = {"id": i, "kind": "algebra", "level": level, "problem": str(problem),
+              "answer": "  or  ".join(f"x = {a}" for a in answers)}
+    if steps:
+        record["steps"] = algebra_steps(problem, 1, timeout=timeout)
+    return record
+
+
+def _algebra_record(item, level, variables, steps, timeout):
+    i, problem = item
+    solve_for = "x" if variables == 2 else None
+    solutions = solve_algebra(problem, solve_for=solve_for, timeout=timeout)
+    record = {"id": i, "kind": "algebra", "level": level, "problem": str(problem),
+              "answer": format_solutions(solutions)}
+    if steps:
+        record["steps"] = algebra_steps(problem, variables, solve_for=solve_for,
+                                        timeout=timeout)
+    return record
+
+
+def write_jsonl(records, out) -> int:
+    """Write records to the text stream out, one JSON object per line."""
+    count = 0
+    buf: list[str] = []
+    for record in records:
+        buf.append(json.dumps(record, ensure_ascii=False))
+        count += 1
+        if len(buf) >= _BUFFER_RECORDS:
+            out.write("\n".join(buf) + "\n")
+            buf.clear()
+    if buf:
+        out.write("\n".join(buf) + "\n")
+    return count
+
+
+def write_csv(records, out, fields: list[str] = FIELDS) -> int:
+    """Write records to the text stream out as CSV with a header row."""
+    count = 0
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=fields, extrasaction="ignore")
+    writer.writeheader()
+    for record in records:
+        writer.writerow(record)
+        count += 1
+        if count % _BUFFER_RECORDS == 0:
+            out.write(buf.getvalue())
+            buf.seek(0)
+            buf.truncate()
+    out.write(buf.getvalue())
+    return count
+
+
+def export(out, n: int, fmt: str = "jsonl", **options) -> dict:
+    """Stream n records (see iter_worksheet for options) to out as fmt.
+
+    Returns {"problems": count, "seconds": elapsed, "per_second": rate}.
+    """
+    start = time.perf_counter()
+    records = iter_worksheet(n, **options)
+    if fmt == "csv":
+        fields = FIELDS + ["steps"] if options.get("steps") else FIELDS
+        count = write_csv(records, out, fields)
+    elif fmt == "jsonl":
+        count = write_jsonl(records, out)
+    else:
+        raise ValueError(f"unknown format {fmt!r} (use jsonl or csv)")
+    elapsed = time.perf_counter() - start
+    return {"problems": count, "seconds": round(elapsed, 3),
+            "per_second": round(count / elapsed, 1) if elapsed > 0 else None}
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Export a worksheet with answer keys.")
+    ap.add_argument("-n", "--count", type=int, default=100)
+    ap.add_argument("--kind", choices=["algebra", "calc"], default="algebra")
+    ap.add_argument("--level", default="mixed",
+                    help="algebra difficulty (as, md, er, mixed) or calculus type (D, I)")
+    ap.add_argument("--variables", type=int, choices=[1, 2], default=1)
+    ap.add_argument("--seed", type=int)
+    ap.add_argument("--steps", action="store_true", help="include step-by-step text")
+    ap.add_argument("--unique", action="store_true", help="no repeated equations")
+    ap.add_argument("--from-answer", action="store_true",
+                    help="build one-variable problems around a known answer")
+    ap.add_argument("--timeout", type=float, help="per-problem solver budget in seconds")
+    ap.add_argument("--workers", type=int, default=1, help="processes solving answer keys")
+    ap.add_argument("--format", choices=["jsonl", "csv"], default="jsonl")
+    ap.add_argument("--out", help="output file (default: stdout)")
+    args = ap.parse_args(argv)
+
+    options = dict(kind=args.kind, level=args.level, variables=args.variables,
+                   seed=args.seed, steps=args.steps, timeout=args.timeout,
+                   unique=args.unique, from_answer=args.from_answer, workers=args.workers)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8", newline="") as out:
+            summary = export(out, args.count, args.format, **options)
+    else:
+        summary = export(sys.stdout, args.count, args.format, **options)
+    print(f"{summary['problems']} problems in {summary['seconds']:.2f}s "
+          f"({summary['per_second']} problems/s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,41 @@
+# lazy.py — put off importing heavy modules (SymPy, NumPy) until they're used
+#
+# Importing SymPy takes a noticeable fraction of a second. Generating an
+# addition/subtraction string or showing the first GUI screen doesn't need
+# it, so main.py and solver.py bind `sp` to a stand-in that imports the real
+# module the first time one of its attributes is looked up.
+
+import importlib
+import importlib.util
+
+__all__ = ["lazy_import", "is_available"]
+
+
+class _LazyModule:
+    """Stand-in for a module that imports it on first attribute access."""
+
+    def __init__(self, name: str):
+        self.__dict__["_lazy_name"] = name
+
+    def __getattr__(self, attr: str):
+        # only called for names we haven't copied over yet
+        module = importlib.import_module(self._lazy_name)
+        value = getattr(module, attr)
+        self.__dict__[attr] = value
+        return value
+
+    def __repr__(self) -> str:
+        return f"<lazy module {self._lazy_name!r}>"
+
+
+def lazy_import(name: str):
+    """Return a stand-in for module `name` that imports it when first used."""
+    return _LazyModule(name)
+
+
+def is_available(name: str) -> bool:
+    """True if module `name` can be imported (without importing it)."""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
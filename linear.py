@@ -0,0 +1,398 @@
+# linear.py — exact, SymPy-free solving for linear equations
+#
+# The addition/subtraction and multiplication/division problems only ever
+# make equations that are linear in x (and y) with small integer constants.
+# For those we can read the string straight into coefficients with
+# fractions.Fraction and solve, check and explain without building any
+# SymPy objects. Every function returns None when the input isn't something
+# we handle, so solver.py can fall back to the SymPy path.
+
+import math
+import re
+from fractions import Fraction
+
+from mathparse import ParseError, as_tokens
+
+__all__ = [
+    "parse_linear",
+    "parse_linear_equation",
+    "solve_linear",
+    "check_linear_answer",
+    "linear_steps",
+    "format_linear",
+]
+
+# A linear form is a dict {variable: coefficient} where the constant term
+# lives under the key "". Zero coefficients are always dropped.
+
+_MAX_DECIMALS = 4   # longer decimals go to SymPy (nsimplify may find a surd)
+
+
+class _NotLinear(Exception):
+    pass
+
+
+# parsing
+
+def _tokenize(source) -> list:
+    """mathparse tokens, with numbers as Fractions; anything non-linear raises."""
+    try:
+        raw = as_tokens(source)
+    except ParseError:
+        raise _NotLinear(source) from None
+    tokens = []
+    for tok in raw:
+        if isinstance(tok, int):
+            tokens.append(Fraction(tok))
+        elif tok in ("+", "-", "*", "/", "(", ")"):
+            tokens.append(tok)
+        elif tok[0].isalpha() and len(tok) == 1 and tok != "I":
+            tokens.append(tok)
+        elif tok[0].isdigit() or tok[0] == ".":
+            if len(tok.partition(".")[2]) > _MAX_DECIMALS:
+                raise _NotLinear(tok)
+            tokens.append(Fraction(tok))
+        else:
+            # ^, √, =, function names, I ... are SymPy's job
+            raise _NotLinear(tok)
+    return tokens
+
+
+def _add(a: dict, b: dict, sign: int = 1) -> dict:
+    out = dict(a)
+    for k, v in b.items():
+        out[k] = out.get(k, 0) + sign * v
+        if out[k] == 0:
+            del out[k]
+    return out
+
+
+def _scale(a: dict, k: Fraction) -> dict:
+    if k == 0:
+        return {}
+    return {name: k * v for name, v in a.items()}
+
+
+def _is_const(a: dict) -> bool:
+    return all(k == "" for k in a)
+
+
+class _Parser:
+    """Recursive descent over + - * / ( ) with implicit multiplication."""
+
+    def __init__(self, tokens: list):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def take(self):
+        tok = self.peek()
+        self.pos += 1
+        return tok
+
+    def parse(self) -> dict:
+        form = self.expr()
+        if self.pos != len(self.tokens):
+            raise _NotLinear(self.peek())
+        return form
+
+    def expr(self) -> dict:
+        form = self.term()
+        while self.peek() in ("+", "-"):
+            sign = 1 if self.take() == "+" else -1
+            form = _add(form, self.term(), sign)
+        return form
+
+    def term(self) -> dict:
+        form = self.unary()
+        while True:
+            tok = self.peek()
+            if tok == "*":
+                self.take()
+                form = self._mul(form, self.unary())
+            elif tok == "/":
+                self.take()
+                divisor = self.unary()
+                if not _is_const(divisor) or not divisor:
+                    raise _NotLinear("/")
+                form = _scale(form, 1 / divisor[""])
+            elif tok is not None and (tok == "(" or not isinstance(tok, str) or tok.isalpha()):
+                # 3x, 2(x + 1), x y ...
+                form = self._mul(form, self.unary())
+            else:
+                return form
+
+    def unary(self) -> dict:
+        tok = self.peek()
+        if tok == "-":
+            self.take()
+            return _scale(self.unary(), Fraction(-1))
+        if tok == "+":
+            self.take()
+            return self.unary()
+        return self.atom()
+
+    def atom(self) -> dict:
+        tok = self.take()
+        if isinstance(tok, Fraction):
+            return {"": tok} if tok else {}
+        if isinstance(tok, str) and tok.isalpha():
+            return {tok: Fraction(1)}
+        if tok == "(":
+            form = self.expr()
+            if self.take() != ")":
+                raise _NotLinear(")")
+            return form
+        raise _NotLinear(tok)
+
+    @staticmethod
+    def _mul(a: dict, b: dict) -> dict:
+        if _is_const(a):
+            return _scale(b, a.get("", Fraction(0)))
+        if _is_const(b):
+            return _scale(a, b.get("", Fraction(0)))
+        raise _NotLinear("*")
+
+
+def parse_linear(text: str) -> dict | None:
+    """Read an expression into a linear form, or None if it isn't linear."""
+    try:
+        tokens = _tokenize(text)
+        if not tokens:
+            return None
+        return _Parser(tokens).parse()
+    except (_NotLinear, ZeroDivisionError, ValueError):
+        return None
+
+
+def parse_linear_equation(problem_str) -> dict | None:
+    """Read "lhs = rhs" (text or a Problem) into the linear form of lhs - rhs."""
+    if isinstance(problem_str, str):
+        if problem_str.count("=") != 1:
+            return None
+        lhs_raw, rhs_raw = problem_str.split("=")
+    else:
+        tokens = as_tokens(problem_str)
+        if tokens.count("=") != 1:
+            return None
+        split = tokens.index("=")
+        lhs_raw, rhs_raw = tokens[:split], tokens[split + 1:]
+    lhs = parse_linear(lhs_raw)
+    rhs = parse_linear(rhs_raw)
+    if lhs is None or rhs is None:
+        return None
+    return _add(lhs, rhs, -1)
+
+
+def _variables(form: dict) -> list[str]:
+    return sorted(k for k in form if k)
+
+
+# solving
+
+def solve_linear(problem_str: str, solve_for: str | None = None):
+    """Solve a linear equation exactly.
+
+    Returns (variable, solution_form), where solution_form is the linear
+    form of the variable's value, or None if we can't handle the equation
+    (not linear, no unique solution, or no clear target variable).
+    """
+    form = parse_linear_equation(problem_str)
+    if form is None:
+        return None
+    return _solve_form(form, solve_for)
+
+
+def _solve_form(form: dict, solve_for: str | None):
+    names = _variables(form)
+    if solve_for is None:
+        if len(names) != 1:
+            return None
+        solve_for = names[0]
+    coeff = form.get(solve_for)
+    if not coeff:
+        return None
+    rest = {k: v for k, v in form.items() if k != solve_for}
+    return solve_for, _scale(rest, -1 / coeff)
+
+
+# printing (matches how SymPy prints the same expressions)
+
+def _format_term(name: str, coeff: Fraction) -> str:
+    if not name:
+        return str(coeff)
+    num, den = coeff.numerator, coeff.denominator
+    if abs(num) == 1:
+        head = name if num == 1 else f"-{name}"
+    else:
+        head = f"{num}*{name}"
+    return head if den == 1 else f"{head}/{den}"
+
+
+def format_linear(form: dict) -> str:
+    """Print a linear form the way SymPy would print the same sum."""
+    if not form:
+        return "0"
+    keys = _variables(form) + ([""] if "" in form else [])
+    # SymPy writes "3 - y" rather than "-y + 3"
+    if len(keys) == 2 and keys[1] == "" and form[keys[0]] < 0 < form[""]:
+        keys.reverse()
+
+    out = ""
+    for i, k in enumerate(keys):
+        text = _format_term(k, form[k])
+        if i == 0:
+            out = text
+        elif text.startswith("-"):
+            out += f" - {text[1:]}"
+        else:
+            out += f" + {text}"
+    return out
+
+
+def _format_factored(form: dict) -> str | None:
+    """What sp.factor prints for a linear form, or None if it's unchanged."""
+    if len(form) < 2:
+        return None
+    values = form.values()
+    content = Fraction(math.gcd(*(v.numerator for v in values)),
+                       math.lcm(*(v.denominator for v in values)))
+    if content == 1:
+        return None
+
+    primitive = _scale(form, 1 / content)
+    names = _variables(primitive)
+    lead = primitive[names[0]] if names else primitive[""]
+    if lead < 0:
+        content = -content
+        primitive = _scale(primitive, Fraction(-1))
+
+    inner = f"({format_linear(primitive)})"
+    n, d = content.numerator, content.denominator
+    if n == 1:
+        head = inner
+    elif n == -1:
+        head = f"-{inner}"
+    else:
+        head = f"{n}*{inner}"
+    return head if d == 1 else f"{head}/{d}"
+
+
+# answer checking
+
+def _display(var: str, value: dict) -> str:
+    return f"{var} = {format_linear(value)}"
+
+
+def check_linear_answer(problem_str: str, user_input: str, num_variables: int,
+                        solve_for: str | None = None):
+    """check_algebra_answer for linear problems, with exact fractions.
+
+    Returns (is_correct, message), or None to let SymPy handle it.
+    """
+    if not user_input.strip():
+        return None
+    form = parse_linear_equation(problem_str)
+    if form is None:
+        return None
+
+    names = _variables(form)
+    if num_variables == 1:
+        if len(names) != 1:
+            return None
+        solved = _solve_form(form, solve_for)
+        if solved is None:
+            return None
+        var, value = solved
+        correct_display = _display(var, value)
+
+        user_values = []
+        for part in re.split(r"[,;]", user_input):
+            part = re.sub(r"^[a-zA-Z]\s*=\s*", "", part.strip())
+            user_form = parse_linear(part)
+            if user_form is None or not _is_const(user_form):
+                return None
+            user_values.append(user_form)
+
+        # a linear equation has exactly one solution
+        if user_values == [value]:
+            return True, "Correct! ✓"
+        return False, f"Not quite.\nCorrect answer: {correct_display}"
+
+    if not solve_for:
+        return None
+    solved = _solve_form(form, solve_for)
+    if solved is None:
+        return None
+    var, value = solved
+    correct_display = _display(var, value)
+
+    user_clean = user_input.strip()
+    m = re.match(r"([a-zA-Z])\s*=\s*(.+)", user_clean)
+    if m:
+        var_name, expr_str = m.group(1), m.group(2)
+    else:
+        var_name, expr_str = solve_for, user_clean
+    user_form = parse_linear(expr_str)
+    if user_form is None:
+        return None
+
+    if var_name == var and user_form == value:
+        return True, "Correct! ✓"
+    return False, f"Not quite.\nCorrect answer: {correct_display}"
+
+
+# step-by-step explanation
+
+def linear_steps(problem_str: str, num_variables: int,
+                 solve_for: str | None = None) -> str | None:
+    """algebra_steps for linear problems, or None to let SymPy handle it."""
+    form = parse_linear_equation(problem_str)
+    if form is None:
+        return None
+    names = _variables(form)
+    if (num_variables == 1 and len(names) != 1) or (num_variables != 1 and not solve_for):
+        return None
+    solved = _solve_form(form, solve_for)
+    if solved is None:
+        return None
+    var, value = solved
+
+    lines: list[str] = []
+    lines.append("─" * 48)
+    lines.append("STEP-BY-STEP SOLUTION")
+    lines.append("─" * 48)
+
+    lines.append("")
+    lines.append("Step 1 ▸ Original equation")
+    lines.append(f"   {problem_str}")
+    if solve_for:
+        lines.append(f"   (Solving for {solve_for})")
+
+    lines.append("")
+    lines.append("Step 2 ▸ Move everything to one side")
+    lines.append(f"   {format_linear(form)} = 0")
+
+    step_num = 3
+    factored = _format_factored(form)
+    if factored is not None:
+        lines.append("")
+        lines.append("Step 3 ▸ Factor / simplify")
+        lines.append(f"   {factored} = 0")
+        step_num = 4
+
+    coeff = form[var]
+    rest = format_linear({k: -v for k, v in form.items() if k != var})
+    lines.append("")
+    lines.append(f"Step {step_num} ▸ Solve for {var}")
+    lines.append(f"   Isolate {var}:")
+    lines.append(f"     {coeff}·{var} = {rest}")
+    if coeff != 1:
+        lines.append(f"     {var} = {rest} / {coeff}")
+    lines.append(f"   ➜  {var} = {format_linear(value)}")
+
+    lines.append("")
+    lines.append("─" * 48)
+    return "\n".join(lines)
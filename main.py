@@ -1,170 +1,197 @@
+import json
 import random
-import sympy as sp
+import sys
+import time
+from functools import partial
 
-def generate_one_variable_problem(difficulty):
+from dedup import DedupIndex, signature
+from lazy import lazy_import
+from problem import Problem
+
+# only the calculus problems need SymPy, so don't pay for it until then
+sp = lazy_import("sympy")
+
+def generate_one_variable_problem(difficulty, rng=None, structured=False):
+    rng = rng or random
     variable = 'x'
     try:
         dd = (difficulty or '').lower()
         # normalize and check difficulty robustly
         if 'add' in dd or 'sub' in dd or dd in ('ad', 'as', 'a/s'):
-            a = random.choice([-1, 1]) * random.randint(1, 10)
-            b = random.choice([-1, 1]) * random.randint(1, 10)
-            sign = random.choice(['+', '-'])
+            a = rng.choice([-1, 1]) * rng.randint(1, 10)
+            b = rng.choice([-1, 1]) * rng.randint(1, 10)
+            sign = rng.choice(['+', '-'])
             order = [a, b, variable]
-            random.shuffle(order)
-            problem = f"{order[1]} {sign} {order[2]} = {order[0]}"
+            rng.shuffle(order)
+            problem = Problem(order[1], sign, order[2], '=', order[0])
         elif 'mult' in dd or 'div' in dd or dd in ('md', 'm/d'):
-            a = random.choice([-1, 1]) * random.randint(1, 10)
-            b = random.choice([-1, 1]) * random.randint(1, 10)
-            c = random.choice([-1, 1]) * random.randint(1, 10)
-            sign = random.choice(['+', '-'])
+            a = rng.choice([-1, 1]) * rng.randint(1, 10)
+            b = rng.choice([-1, 1]) * rng.randint(1, 10)
+            c = rng.choice([-1, 1]) * rng.randint(1, 10)
+            sign = rng.choice(['+', '-'])
             MD = (['/','*'])
-            variableExist = ([variable, random.randint(1,5)])
-            order1 = [a, random.choice(variableExist)]
-            order2 = [b, random.choice(variableExist)]
-            order3 = [c, random.choice(variableExist)]
-            random.shuffle(order1)
-            random.shuffle(order2)
-            random.shuffle(order3)
-            problem = f"{order1[0]}{random.choice(MD)}{order1[1]} {sign} {order2[0]}{random.choice(MD)}{order2[1]} = {order3[0]}{random.choice(MD)}{order3[1]}"
+            variableExist = ([variable, rng.randint(1,5)])
+            order1 = [a, rng.choice(variableExist)]
+            order2 = [b, rng.choice(variableExist)]
+            order3 = [c, rng.choice(variableExist)]
+            rng.shuffle(order1)
+            rng.shuffle(order2)
+            rng.shuffle(order3)
+            problem = Problem(order1[0], rng.choice(MD), order1[1], sign, order2[0], rng.choice(MD), order2[1], '=', order3[0], rng.choice(MD), order3[1])
             if variable not in problem:
-                problem = f"{variable} {sign} {order2[0]} = {order3[0]}"
+                problem = Problem(variable, sign, order2[0], '=', order3[0])
         
         elif 'exponent' in dd or 'root' in dd or dd in ('er', 'e/r'):
-            a = random.choice([-1, 1]) * random.randint(1, 10)
-            b = random.choice([-1, 1]) * random.randint(1, 10)
-            c = random.choice([-1, 1]) * random.randint(1, 10)
-            exponent = random.randint(2, 3)
-            sign = random.choice(['^', '√'])
-            AS = random.choice(['+', '-'])
+            a = rng.choice([-1, 1]) * rng.randint(1, 10)
+            b = rng.choice([-1, 1]) * rng.randint(1, 10)
+            c = rng.choice([-1, 1]) * rng.randint(1, 10)
+            exponent = rng.randint(2, 3)
+            sign = rng.choice(['^', '√'])
+            AS = rng.choice(['+', '-'])
             order = [a, b, c]
             variableExist = ([variable, ''])
-            random.shuffle(order)
+            rng.shuffle(order)
             if sign == '^':
-                problem = f"{order[1]}{random.choice(variableExist)} {AS} {order[2]}{random.choice(variableExist)}^{exponent} = {order[0]}{random.choice(variableExist)}"
+                problem = Problem(order[1], rng.choice(variableExist), AS, order[2], rng.choice(variableExist), '^', exponent, '=', order[0], rng.choice(variableExist))
                 if variable not in problem:
-                    problem = f"{order[1]} {AS} {order[2]} = {variable}^{exponent}"
+                    problem = Problem(order[1], AS, order[2], '=', variable, '^', exponent)
             else:
-                problem = f"{order[1]}{random.choice(variableExist)} {AS} √{order[2]*order[2]}{random.choice(variableExist)} = {order[0]}{random.choice(variableExist)}"
+                problem = Problem(order[1], rng.choice(variableExist), AS, '√', order[2]*order[2], rng.choice(variableExist), '=', order[0], rng.choice(variableExist))
                 if variable not in problem:
-                    problem = f"{order[1]} {AS} √{order[2]*order[2]} = {variable}"
+                    problem = Problem(order[1], AS, '√', order[2]*order[2], '=', variable)
 
         elif 'mixed' in dd:
-            a = random.choice([-1, 1]) * random.randint(1, 10)
-            b = random.choice([-1, 1]) * random.randint(1, 10)
-            c = random.choice([-1, 1]) * random.randint(1, 10)
-            AS = random.choice(['+', '-'])
-            MD = random.choice(['*', '/'])
-            ER = random.choice(['^', '√'])
-            variableExist = ([variable, random.randint(1,5)])
-            order1 = [a, random.choice(variableExist)]
-            order2 = [b, random.choice(variableExist)]
-            order3 = [c, random.choice(variableExist)]
-            random.shuffle(order1)
-            random.shuffle(order2)
-            random.shuffle(order3)
+            a = rng.choice([-1, 1]) * rng.randint(1, 10)
+            b = rng.choice([-1, 1]) * rng.randint(1, 10)
+            c = rng.choice([-1, 1]) * rng.randint(1, 10)
+            AS = rng.choice(['+', '-'])
+            MD = rng.choice(['*', '/'])
+            ER = rng.choice(['^', '√'])
+            variableExist = ([variable, rng.randint(1,5)])
+            order1 = [a, rng.choice(variableExist)]
+            order2 = [b, rng.choice(variableExist)]
+            order3 = [c, rng.choice(variableExist)]
+            rng.shuffle(order1)
+            rng.shuffle(order2)
+            rng.shuffle(order3)
             signs = [MD, ER]
-            random.shuffle(signs)
-            problem = f"{order1[0]}{signs[0]}{order1[1]} {AS} {order2[0]}{signs[1]}{order2[1]} = {order3[0]}{signs[0]}{order3[1]}"
+            rng.shuffle(signs)
+            problem = Problem(order1[0], signs[0], order1[1], AS, order2[0], signs[1], order2[1], '=', order3[0], signs[0], order3[1])
             if variable not in problem:
-                problem = f"{order1[0]}{signs[0]}{order1[1]} {AS} {order2[0]}{signs[1]}{order2[1]} = {variable}{signs[0]}{order3[1]}"
-        return problem
+                problem = Problem(order1[0], signs[0], order1[1], AS, order2[0], signs[1], order2[1], '=', variable, signs[0], order3[1])
+        return problem if structured else str(problem)
     
     except (UnboundLocalError, EOFError):
       print("Incorrect Input!")
       return None
     
-def generate_two_variable_problem(difficulty):
+def generate_two_variable_problem(difficulty, rng=None, structured=False):
+    rng = rng or random
     variable1 = 'x'
     variable2 = 'y'
     try:
         dd = (difficulty or '').lower()
         if 'add' in dd or 'sub' in dd or dd in ('as', 'a/s', 'ad'):
-            a = random.choice([-1, 1]) * random.randint(1, 10)
-            sign = random.choice(['+', '-'])
+            a = rng.choice([-1, 1]) * rng.randint(1, 10)
+            sign = rng.choice(['+', '-'])
             order = [a, variable1, variable2]
-            random.shuffle(order)
-            problem = f"{order[1]} {sign} {order[2]} = {order[0]}"
+            rng.shuffle(order)
+            problem = Problem(order[1], sign, order[2], '=', order[0])
         elif 'mult' in dd or 'div' in dd or dd in ('md', 'm/d'):
-            a = random.choice([-1, 1]) * random.randint(1, 10)
-            b = random.choice([-1, 1]) * random.randint(1, 10)
-            c = random.choice([-1, 1]) * random.randint(1, 10)
-            sign = random.choice(['+', '-'])
+            a = rng.choice([-1, 1]) * rng.randint(1, 10)
+            b = rng.choice([-1, 1]) * rng.randint(1, 10)
+            c = rng.choice([-1, 1]) * rng.randint(1, 10)
+            sign = rng.choice(['+', '-'])
             MD = ['*', '/']
             order = [a,b,c, variable1, variable2]
-            random.shuffle(order)
-            problem = f"{order[1]}{random.choice(MD)}{order[2]} {sign} {order[3]}{random.choice(MD)}{order[4]} = {order[0]}"
+            rng.shuffle(order)
+            problem = Problem(order[1], rng.choice(MD), order[2], sign, order[3], rng.choice(MD), order[4], '=', order[0])
         elif 'exponent' in dd or 'root' in dd or dd in ('er', 'e/r'):
-            a = random.choice([-1, 1]) * random.randint(1, 10)
-            b = random.choice([-1, 1]) * random.randint(1, 10)
-            c = random.choice([-1, 1]) * random.randint(1, 10)
-            exponent = random.randint(2, 3)
-            sign = random.choice(['^', '√'])
-            AS = random.choice(['+', '-'])
+            a = rng.choice([-1, 1]) * rng.randint(1, 10)
+            b = rng.choice([-1, 1]) * rng.randint(1, 10)
+            c = rng.choice([-1, 1]) * rng.randint(1, 10)
+            exponent = rng.randint(2, 3)
+            sign = rng.choice(['^', '√'])
+            AS = rng.choice(['+', '-'])
             order = [a, b, c]
-            random.shuffle(order)
+            rng.shuffle(order)
             if sign == '^':
-                problem = f"{order[1]}{random.choice([variable1, variable2])} {AS} {order[2]}{random.choice([variable1, variable2])}^{exponent} = {order[0]}{random.choice([variable1, variable2])}"
+                problem = Problem(order[1], rng.choice([variable1, variable2]), AS, order[2], rng.choice([variable1, variable2]), '^', exponent, '=', order[0], rng.choice([variable1, variable2]))
                 if variable1 not in problem or variable2 not in problem:
-                    problem = f"{order[1]} {AS} {order[2]} = {variable1}^{exponent}*{variable2}"
+                    problem = Problem(order[1], AS, order[2], '=', variable1, '^', exponent, '*', variable2)
             else:
-                problem = f"{order[0]}{random.choice([variable1, variable2])} {AS} √{order[1]*order[1]}{random.choice([variable1, variable2])} = {order[2]}{random.choice([variable1, variable2])}"
+                problem = Problem(order[0], rng.choice([variable1, variable2]), AS, '√', order[1]*order[1], rng.choice([variable1, variable2]), '=', order[2], rng.choice([variable1, variable2]))
                 if variable1 not in problem or variable2 not in problem:
-                    problem = f"{order[0]} {AS} √{order[1]*order[1]} = {variable1}*{variable2}"
+                    problem = Problem(order[0], AS, '√', order[1]*order[1], '=', variable1, '*', variable2)
 
         elif 'mixed' in dd:
-            a = random.choice([-1, 1]) * random.randint(1, 10)
-            b = random.choice([-1, 1]) * random.randint(1, 10)
-            c = random.choice([-1, 1]) * random.randint(1, 10)
-            AS = random.choice(['+', '-'])
-            MD = random.choice(['*', '/'])
-            ER = random.choice(['^', '√'])
+            a = rng.choice([-1, 1]) * rng.randint(1, 10)
+            b = rng.choice([-1, 1]) * rng.randint(1, 10)
+            c = rng.choice([-1, 1]) * rng.randint(1, 10)
+            AS = rng.choice(['+', '-'])
+            MD = rng.choice(['*', '/'])
+            ER = rng.choice(['^', '√'])
             order = [a,b,c, variable1, variable2]
-            random.shuffle(order)
+            rng.shuffle(order)
             signs = [MD, ER]
-            random.shuffle(signs)
-            problem = f"{order[0]}{signs[0]}{order[3]} {AS} {order[1]}{signs[1]}{order[4]} = {order[2]}{signs[0]}{order[3]}"
-        return problem
+            rng.shuffle(signs)
+            problem = Problem(order[0], signs[0], order[3], AS, order[1], signs[1], order[4], '=', order[2], signs[0], order[3])
+        return problem if structured else str(problem)
 
 
     except (UnboundLocalError, EOFError):
         print("Incorrect Input!")
         return None
 
-def generate_Calc_problem(CalcType):
+def generate_Calc_problem(CalcType, rng=None):
+    rng = rng or random
     x = sp.symbols('x')
     try:
+        # Each family returns (f, f', ∫f). We know the shape and the
+        # coefficients when we build f, so the derivative and antiderivative
+        # come straight from the textbook rules instead of sp.diff /
+        # sp.integrate (which is slow for integrals). A family without rules
+        # can return None for either one and SymPy works it out.
         def random_polynomial(max_deg=3):
-            deg = random.randint(1, max_deg)
-            coeffs = [random.randint(-5, 5) for _ in range(deg + 1)]
-            return sum(coeffs[i] * x**i for i in range(deg + 1))
-
-        def random_trig() -> sp.Expr:
-            a = sp.Integer(random.randint(1, 5))
-            b = sp.Integer(random.randint(1, 3))
-            c = sp.Integer(random.randint(1, 5))
-            d = sp.Integer(random.randint(1, 3))
-            result: sp.Expr = a * sp.sin(b * x) + c * sp.cos(d * x)  # type: ignore[operator]
-            return result
-
-        def random_exp_log() -> sp.Expr:
-            a = sp.Integer(random.randint(1, 4))
-            b = sp.Integer(random.randint(1, 3))
-            expr: sp.Expr = a * sp.exp(b * x)  # type: ignore[operator]
-            if random.choice([True, False]):
-                c = sp.Integer(random.randint(1, 3))
-                expr = expr + c * sp.log(x)  # type: ignore[operator]
-            return expr
+            deg = rng.randint(1, max_deg)
+            coeffs = [rng.randint(-5, 5) for _ in range(deg + 1)]
+            f = sum(coeffs[i] * x**i for i in range(deg + 1))
+            df = sum((i * coeffs[i] * x**(i - 1) for i in range(1, deg + 1)), sp.Integer(0))
+            F = sum((sp.Rational(coeffs[i], i + 1) * x**(i + 1) for i in range(deg + 1)), sp.Integer(0))
+            return f, df, F
+
+        def random_trig():
+            a = sp.Integer(rng.randint(1, 5))
+            b = sp.Integer(rng.randint(1, 3))
+            c = sp.Integer(rng.randint(1, 5))
+            d = sp.Integer(rng.randint(1, 3))
+            f = a * sp.sin(b * x) + c * sp.cos(d * x)
+            df = a * b * sp.cos(b * x) - c * d * sp.sin(d * x)
+            F = -a / b * sp.cos(b * x) + c / d * sp.sin(d * x)
+            return f, df, F
+
+        def random_exp_log():
+            a = sp.Integer(rng.randint(1, 4))
+            b = sp.Integer(rng.randint(1, 3))
+            f = a * sp.exp(b * x)
+            df = a * b * sp.exp(b * x)
+            F = a / b * sp.exp(b * x)
+            if rng.choice([True, False]):
+                c = sp.Integer(rng.randint(1, 3))
+                f = f + c * sp.log(x)
+                df = df + c / x
+                F = F + c * x * sp.log(x) - c * x
+            return f, df, F
 
         generators = [random_polynomial, random_trig, random_exp_log]
-        f = random.choice(generators)()
+        f, df, F = rng.choice(generators)()
 
         if CalcType == 'D':
             problem = f"Differentiate: {f}"
-            solution = sp.diff(f, x)
+            solution = df if df is not None else sp.diff(f, x)
         elif CalcType == 'I':
             problem = f"Integrate: {f}"
-            solution = sp.integrate(f, x)
+            solution = F if F is not None else sp.integrate(f, x)
         else:
             print("CalcType must be 'D' or 'I'")
             return None
@@ -174,7 +201,336 @@ def generate_Calc_problem(CalcType):
         print("Incorrect Input:", e)
         return None
     
-def main():
+# answer-first generation
+#
+# Picks the answer first and builds a one-variable equation around it, so
+# every problem has a nice solution we already know. No solver call, and
+# no retrying equations that turn out to have no (or an ugly) answer.
+
+def _fill_in(rng, answer):
+    """Numbers p, q, sign and which slot holds x, for "p sign q = r" == answer."""
+    sign = rng.choice(['+', '-'])
+    step = 1 if sign == '+' else -1
+    other = rng.choice([-1, 1]) * rng.randint(1, 10)
+    slot = rng.randrange(3)
+    if slot == 0:       # x sign q = r
+        return ['x', sign, other, '=', answer + step * other]
+    if slot == 1:       # p sign x = r
+        return [other, sign, 'x', '=', other + step * answer]
+    # p sign q = x: the answer is made of the two numbers
+    return [answer - step * other, sign, other, '=', 'x']
+
+
+def generate_from_answer(difficulty, rng=None, structured=False):
+    """Make a one-variable problem from its answer.
+
+    Returns (problem, answers), where answers is the sorted tuple of every
+    solution (two for the x^2 families). difficulty is the same as for
+    generate_one_variable_problem.
+    """
+    rng = rng or random
+    dd = (difficulty or '').lower()
+    AS = rng.choice(['+', '-'])
+    step = 1 if AS == '+' else -1
+    b = rng.randint(1, 10)
+
+    if 'add' in dd or 'sub' in dd or dd in ('ad', 'as', 'a/s'):
+        answer = rng.choice([-1, 1]) * rng.randint(1, 10)
+        problem = Problem(*_fill_in(rng, answer))
+        answers = (answer,)
+    elif 'mult' in dd or 'div' in dd or dd in ('md', 'm/d'):
+        a = rng.choice([-1, 1]) * rng.randint(2, 10)
+        k = rng.choice([-1, 1]) * rng.randint(1, 10)
+        if rng.choice([True, False]):
+            answer = k                              # a*x ± b = c
+            problem = Problem(a, '*', 'x', AS, b, '=', a * k + step * b)
+        else:
+            answer = a * k                          # x/a ± b = c
+            problem = Problem('x', '/', a, AS, b, '=', k + step * b)
+        answers = (answer,)
+    elif 'exponent' in dd or 'root' in dd or dd in ('er', 'e/r'):
+        root = rng.randint(1, 10)
+        if rng.choice([True, False]):
+            problem = Problem('x', '^', 2, AS, b, '=', root * root + step * b)
+            answers = (-root, root)
+        else:
+            a = rng.choice([-1, 1]) * rng.randint(2, 10)
+            answer = rng.choice([-1, 1]) * root     # a x ± √(b²) = c
+            problem = Problem(a, 'x', AS, '√', b * b, '=', a * answer + step * b)
+            answers = (answer,)
+    elif 'mixed' in dd:
+        a = rng.randint(2, 5)
+        root = rng.randint(1, 10)
+        if rng.choice([True, False]):
+            problem = Problem(a, '*', 'x', '^', 2, AS, '√', b * b, '=', a * root * root + step * b)
+            answers = (-root, root)
+        else:
+            k = rng.choice([-1, 1]) * rng.randint(1, 10)
+            problem = Problem('x', '/', a, AS, '√', b * b, '=', k + step * b)
+            answers = (a * k,)
+    else:
+        print("Incorrect Input!")
+        return None
+    return (problem if structured else str(problem)), answers
+
+
+# batch generation
+#
+# Each batch gets its own random.Random, so the same seed always gives
+# the same problem set and the global random module is left alone. With
+# unique=True, repeats of an equation we already gave out (like "3 + x = 5"
+# after "x + 3 = 5") are skipped using dedup's cheap signatures.
+
+_MAX_REPEATS = 1000     # a unique batch gives up after this many repeats in a row
+
+
+def _batch(make, n, arg, seed, seen=None):
+    rng = random.Random(seed)
+    made = repeats = 0
+    while made < n:
+        problem = make(arg, rng)
+        if problem is None:
+            return
+        if seen is not None and not seen.add(problem):
+            repeats += 1
+            if repeats >= _MAX_REPEATS:
+                return      # there probably aren't n different problems to be had
+            continue
+        repeats = 0
+        made += 1
+        yield problem
+
+
+def iter_problems(n, difficulty, variables=1, seed=None, structured=False, unique=False):
+    """Yield n algebra problems (one or two variables) from a seeded RNG.
+
+    With structured=True they come out as Problem tuples instead of strings.
+    With unique=True no equation repeats (the batch may come up short if
+    the difficulty doesn't have n different ones).
+    """
+    make = generate_one_variable_problem if variables == 1 else generate_two_variable_problem
+    if not unique:
+        return _batch(partial(make, structured=structured), n, difficulty, seed)
+    # signatures are cheapest to take from the structured form
+    problems = _batch(partial(make, structured=True), n, difficulty, seed, DedupIndex())
+    return problems if structured else map(str, problems)
+
+
+def generate_problems(n, difficulty, variables=1, seed=None, structured=False, unique=False):
+    """Like iter_problems, but returns the whole list."""
+    return list(iter_problems(n, difficulty, variables, seed, structured, unique))
+
+
+def iter_problems_with_answers(n, difficulty, seed=None, structured=False, unique=False):
+    """Yield n (problem, answers) pairs made answer-first (see generate_from_answer)."""
+    make = partial(generate_from_answer, structured=structured)
+    seen = DedupIndex(key=lambda pair: signature(pair[0])) if unique else None
+    return _batch(make, n, difficulty, seed, seen)
+
+
+def generate_problems_with_answers(n, difficulty, seed=None, structured=False, unique=False):
+    """Like iter_problems_with_answers, but returns the whole list."""
+    return list(iter_problems_with_answers(n, difficulty, seed, structured, unique))
+
+
+def iter_Calc_problems(n, CalcType, seed=None, unique=False):
+    """Yield n (problem, solution) calculus pairs from a seeded RNG."""
+    seen = DedupIndex(key=lambda pair: pair[0]) if unique else None
+    return _batch(generate_Calc_problem, n, CalcType, seed, seen)
+
+
+def generate_Calc_problems(n, CalcType, seed=None, unique=False):
+    """Like iter_Calc_problems, but returns the whole list."""
+    return list(iter_Calc_problems(n, CalcType, seed, unique))
+
+
+# command line
+#
+#   python main.py                                   the interactive loop
+#   python main.py generate -n 1000 --difficulty mixed --format csv
+#   python main.py generate -n 200 --type calc --difficulty I --steps
+#   python main.py solve problems.txt --workers 4
+#   python main.py check answers.jsonl --out graded.jsonl
+#   python main.py generate -n 100 | python main.py steps
+#
+# solve, check and steps read one item per line from a file or stdin: plain
+# text ("2*x + 3 = 7", or for check the problem and the answer separated by
+# a tab), or a JSON object with the fields server.py takes, like
+# {"problem": ..., "answer": ..., "num_variables": 2, "solve_for": "x"}.
+# With --type calc, plain problems are written like the generator's
+# ("Differentiate: x**2") and the reference solution is worked out from them.
+# Results stream out in input order as they're ready, and a throughput and
+# latency summary goes to stderr at the end.
+
+_CHUNK = 8      # input lines per pool job
+
+
+def _line_item(mode, line, defaults):
+    if line.startswith("{"):
+        item = json.loads(line)
+        if not isinstance(item, dict):
+            raise ValueError("JSON lines must be objects")
+    elif mode == "check":
+        problem, tab, answer = line.partition("\t")
+        if not tab:
+            raise ValueError("expected the problem and the answer separated by a tab")
+        item = {"problem": problem.strip(), "answer": answer.strip()}
+    else:
+        item = {"problem": line}
+    for key, value in defaults.items():
+        item.setdefault(key, value)
+    return item
+
+
+def _run_line(line, mode, defaults, timeout):
+    """(record, seconds) for one input line; runs in the pool workers."""
+    from server import run_item
+
+    start = time.perf_counter()
+    try:
+        item = _line_item(mode, line, defaults)
+    except ValueError as e:
+        record = {"problem": line, "error": str(e)}
+    else:
+        record = {**item, **run_item(mode, item, timeout)}
+    return record, time.perf_counter() - start
+
+
+def _stream_lines(mode, lines, defaults, workers=1, timeout=None):
+    """Yield (record, seconds) for each non-blank line, in input order."""
+    from solver import run_many
+
+    lines = (line for line in (raw.strip() for raw in lines) if line)
+    task = partial(_run_line, mode=mode, defaults=defaults, timeout=timeout)
+    return run_many(task, lines, workers, _CHUNK)
+
+
+def _stream_worksheet(args):
+    """Yield (record, seconds) for each generated worksheet record.
+
+    With a pool the records arrive in bursts, so the time between them says
+    nothing about one record and seconds is None.
+    """
+    from export import iter_worksheet
+
+    records = iter_worksheet(args.count, args.type, args.difficulty, args.variables, args.seed,
+                             args.steps, args.timeout, args.unique, args.from_answer,
+                             args.workers)
+    if args.workers > 1:
+        yield from ((record, None) for record in records)
+        return
+    while True:
+        start = time.perf_counter()
+        record = next(records, None)
+        if record is None:
+            return
+        yield record, time.perf_counter() - start
+
+
+_CSV_FIELDS = {
+    "solve": ["problem", "answer", "error"],
+    "check": ["problem", "answer", "correct", "message", "error"],
+    "steps": ["problem", "steps", "error"],
+}
+
+
+def _batch_cli(argv):
+    import argparse
+    from array import array
+    from export import FIELDS, write_csv, write_jsonl
+
+    ap = argparse.ArgumentParser(
+        prog="main.py", description="Generate, solve, check or explain problems in bulk. "
+        "Run with no arguments for the interactive prompt.")
+    ap.add_argument("mode", choices=["generate", "solve", "check", "steps"])
+    ap.add_argument("input", nargs="?", default="-",
+                    help="for solve/check/steps: a file with one item per line (default: stdin)")
+    ap.add_argument("--type", choices=["algebra", "calc"], default="algebra")
+    ap.add_argument("--difficulty", default="mixed",
+                    help="algebra difficulty (as, md, er, mixed) or calculus type (D, I)")
+    ap.add_argument("--variables", type=int, choices=[1, 2], default=1)
+    ap.add_argument("--solve-for", help="variable to solve for (default: x with 2 variables)")
+    ap.add_argument("-n", "--count", type=int, default=10, help="problems to generate")
+    ap.add_argument("--seed", type=int)
+    ap.add_argument("--unique", action="store_true", help="generate: no repeated equations")
+    ap.add_argument("--from-answer", action="store_true",
+                    help="generate: build one-variable problems around a known answer")
+    ap.add_argument("--steps", action="store_true", help="generate: include step-by-step text")
+    ap.add_argument("--workers", type=int, default=1, help="processes doing the solving")
+    ap.add_argument("--timeout", type=float, help="per-item solver budget in seconds")
+    ap.add_argument("--format", choices=["jsonl", "csv"], default="jsonl")
+    ap.add_argument("--out", help="output file (default: stdout)")
+    args = ap.parse_args(argv)
+
+    if args.type == "calc" and args.mode == "generate" and args.difficulty not in ("D", "I"):
+        ap.error("--type calc needs --difficulty D or I")
+    if args.type == "calc" and args.mode == "solve":
+        ap.error("solve is for algebra; calculus problems come with their solution")
+
+    source = None
+    if args.mode == "generate":
+        stream = _stream_worksheet(args)
+        fields = FIELDS + ["steps"] if args.steps else FIELDS
+    else:
+        if args.type == "calc":
+            defaults = {"kind": "calc"}
+        else:
+            solve_for = args.solve_for or ("x" if args.variables == 2 else None)
+            defaults = {"num_variables": args.variables, "solve_for": solve_for}
+        try:
+            source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+        except OSError as e:
+            ap.error(f"can't read {args.input}: {e.strerror}")
+        stream = _stream_lines(args.mode, source, defaults, args.workers, args.timeout)
+        fields = _CSV_FIELDS[args.mode]
+
+    latencies = array("d")
+    count = errors = 0
+
+    def records():
+        nonlocal count, errors
+        for record, seconds in stream:
+            count += 1
+            errors += "error" in record
+            if seconds is not None:
+                latencies.append(seconds)
+            yield record
+
+    out = sys.stdout if not args.out else open(args.out, "w", encoding="utf-8", newline="")
+    start = time.perf_counter()
+    try:
+        if args.format == "csv":
+            write_csv(records(), out, fields)
+        else:
+            write_jsonl(records(), out)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if source not in (None, sys.stdin):
+            source.close()
+    elapsed = time.perf_counter() - start
+
+    summary = f"{count} items in {elapsed:.2f}s"
+    if count and elapsed > 0:
+        summary += f" ({count / elapsed:.1f} items/s)"
+    if latencies:
+        ordered = sorted(latencies)
+        p99 = ordered[min(len(ordered) - 1, int(0.99 * len(ordered)))]
+        summary += (f"; per item median {ordered[len(ordered) // 2] * 1e3:.2f} ms, "
+                    f"p99 {p99 * 1e3:.2f} ms")
+    print(f"{summary}; {errors} errors", file=sys.stderr)
+    return 1 if errors else 0
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv:
+        return _batch_cli(argv)
+    interactive()
+    return 0
+
+
+def interactive():
     while True:
         ProblemType = input("Would you like to solve a Calculus or Algerbra Problem? Press C for Calculus and A for Algerbra: ")
         if ProblemType == 'A':
@@ -208,4 +564,4 @@ def main():
             
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
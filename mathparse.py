@@ -0,0 +1,241 @@
+# mathparse.py — one-pass tokenizer + Pratt parser for the app's math syntax
+#
+# Replaces the old regex rewrite + sp.sympify round trip. We read the
+# syntax students and the generators actually use and build SymPy
+# expressions directly, without going through Python's parser or eval:
+#
+#   3x, 2(x + 1), (x)(y)   implicit multiplication
+#   x^2, x**2              powers (right-associative, above unary minus)
+#   √16, √x                square root of the next factor
+#   sin(2x), ln(x), ...    the calculus function names
+#   pi, I, e               constants (e only where we ask for it)
+#   x y, x*y               variables are single letters
+#
+# Any other multi-letter word (sec, abs, xy, ...) is a ParseError rather
+# than a product of letters.
+
+import re
+
+from lazy import lazy_import
+from problem import Problem
+
+sp = lazy_import("sympy")
+
+__all__ = [
+    "ParseError",
+    "tokenize",
+    "as_tokens",
+    "parse_expr",
+    "parse_equation",
+    "calc_constants",
+]
+
+
+class ParseError(ValueError):
+    """The text isn't something we know how to read."""
+
+
+# tokens are plain values: int for whole numbers, and str for everything
+# else (decimal literals like "2.5", operators, names)
+
+_FUNCTION_NAMES = ("sqrt", "sin", "cos", "tan", "exp", "log", "ln")
+_NAMED_CONSTANTS = ("pi",)
+_KNOWN_WORDS = frozenset(_FUNCTION_NAMES + _NAMED_CONSTANTS)
+
+_TOKEN_RE = re.compile(r"""
+    \s*(?:
+        (?P<int>\d+(?!\d*\.))
+      | (?P<dec>\d+\.\d*|\.\d+)
+      | (?P<word>[A-Za-z]+)
+      | (?P<op>\*\*|[-+*/^()√=,])
+    )""", re.VERBOSE)
+
+def tokenize(text: str) -> list:
+    """Split text into tokens in a single pass."""
+    tokens: list = []
+    append = tokens.append
+    pos = 0
+    end = len(text.rstrip())
+    match = _TOKEN_RE.match
+    while pos < end:
+        m = match(text, pos)
+        if m is None:
+            raise ParseError(f"unexpected character {text[pos:].strip()[:1]!r}")
+        kind = m.lastgroup
+        value = m.group(kind)
+        if kind == "int":
+            append(int(value))
+        elif kind == "word":
+            if len(value) > 1 and value not in _KNOWN_WORDS:
+                raise ParseError(f"don't know what {value!r} means")
+            append(value)
+        elif value == "**":
+            append("^")
+        else:
+            append(value)
+        pos = m.end()
+    return tokens
+
+
+# binding powers
+_INFIX_BP = {"+": 10, "-": 10, "*": 20, "/": 20, "^": 40}
+_IMPLICIT_BP = 20
+_PREFIX_BP = 30     # unary minus sits below ^, so -x^2 == -(x^2)
+_SQRT_BP = 45       # √ takes just the next factor: √16x == sqrt(16)*x
+
+_functions_table = None
+
+
+def _functions() -> dict:
+    # built on first use so importing this module doesn't load SymPy
+    global _functions_table
+    if _functions_table is None:
+        _functions_table = {
+            "sqrt": sp.sqrt, "sin": sp.sin, "cos": sp.cos, "tan": sp.tan,
+            "exp": sp.exp, "log": sp.log, "ln": sp.log,
+        }
+    return _functions_table
+
+
+def calc_constants() -> dict:
+    """Constants for calculus input, where e means Euler's number."""
+    return {"e": sp.E, "pi": sp.pi, "I": sp.I}
+
+
+class _Parser:
+    def __init__(self, tokens, constants: dict | None, symbols: dict):
+        self.tokens = tokens
+        self.pos = 0
+        self.constants = constants if constants is not None else {"pi": sp.pi, "I": sp.I}
+        self.symbols = symbols
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def advance(self):
+        tok = self.peek()
+        if tok is None:
+            raise ParseError("unexpected end of input")
+        self.pos += 1
+        return tok
+
+    def expect(self, tok) -> None:
+        if self.advance() != tok:
+            raise ParseError(f"expected {tok!r}")
+
+    def parse(self):
+        expr = self.expression(0)
+        if self.pos != len(self.tokens):
+            raise ParseError(f"unexpected {self.peek()!r}")
+        return expr
+
+    def expression(self, min_bp: int):
+        left = self.prefix(self.advance())
+        while True:
+            tok = self.peek()
+            if tok is None:
+                return left
+            bp = _INFIX_BP.get(tok) if isinstance(tok, str) else None
+            if bp is None:
+                if not self._starts_factor(tok):
+                    return left
+                # implicit multiplication: 3x, 2(x+1), x√2
+                if _IMPLICIT_BP <= min_bp:
+                    return left
+                left = left * self.expression(_IMPLICIT_BP)
+                continue
+            if bp <= min_bp:
+                return left
+            self.pos += 1
+            if tok == "^":
+                left = left ** self.expression(bp - 1)      # right-associative
+            else:
+                right = self.expression(bp)
+                if tok == "+":
+                    left = left + right
+                elif tok == "-":
+                    left = left - right
+                elif tok == "*":
+                    left = left * right
+                else:
+                    left = left / right
+
+    @staticmethod
+    def _starts_factor(tok) -> bool:
+        if isinstance(tok, int):
+            return True
+        return tok == "(" or tok == "√" or tok[0].isalnum() or tok[0] == "."
+
+    def prefix(self, tok):
+        if isinstance(tok, int):
+            return sp.Integer(tok)
+        if tok == "-":
+            return -self.expression(_PREFIX_BP)
+        if tok == "+":
+            return self.expression(_PREFIX_BP)
+        if tok == "(":
+            expr = self.expression(0)
+            self.expect(")")
+            return expr
+        if tok == "√":
+            return sp.sqrt(self.expression(_SQRT_BP))
+        if tok[0].isdigit() or tok[0] == ".":
+            return sp.Float(tok)
+        if tok[0].isalpha():
+            return self.name(tok)
+        raise ParseError(f"unexpected {tok!r}")
+
+    def name(self, tok: str):
+        if tok in _FUNCTION_NAMES and self.peek() == "(":
+            self.pos += 1
+            args = [self.expression(0)]
+            while self.peek() == ",":
+                self.pos += 1
+                args.append(self.expression(0))
+            self.expect(")")
+            return _functions()[tok](*args)
+        if tok in self.constants:
+            return self.constants[tok]
+        if len(tok) == 1:
+            sym = self.symbols.get(tok)
+            if sym is None:
+                sym = self.symbols[tok] = sp.Symbol(tok)
+            return sym
+        raise ParseError(f"don't know what {tok!r} means here")
+
+
+def as_tokens(source) -> list:
+    """Tokens for text, a Problem, or something that's already a token list."""
+    if isinstance(source, str):
+        return tokenize(source)
+    if isinstance(source, Problem):
+        return source.tokens()      # already split up, nothing to scan
+    return list(source)
+
+
+def parse_expr(source, constants: dict | None = None, symbols: dict | None = None):
+    """Parse text (or a Problem, or a token list) into a SymPy expression.
+
+    constants maps names like "pi" or "e" to values; by default pi and I
+    are the constants. symbols lets callers reuse Symbol objects by name.
+    """
+    tokens = as_tokens(source)
+    if not tokens:
+        raise ParseError("empty expression")
+    return _Parser(tokens, constants, symbols if symbols is not None else {}).parse()
+
+
+def parse_equation(source, constants: dict | None = None):
+    """Parse "lhs = rhs" (text, a Problem or tokens).
+
+    Returns (lhs, rhs, symbols), where symbols lists the variables in the
+    order they first appear.
+    """
+    tokens = as_tokens(source)
+    if "=" not in tokens:
+        raise ParseError("no '=' in equation")
+    split = tokens.index("=")
+    symbols: dict = {}
+    lhs = parse_expr(tokens[:split], constants, symbols)
+    rhs = parse_expr(tokens[split + 1:], constants, symbols)
+    return lhs, rhs, list(symbols.values())
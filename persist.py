@@ -0,0 +1,154 @@
+# persist.py — an on-disk cache that survives restarts and is shared between processes
+#
+# solver.py puts this in front of solve_algebra, algebra_steps and calc_steps
+# when it's switched on (see solver.enable_disk_cache). It's a single SQLite
+# file in WAL mode, so any number of threads and worker processes can read
+# while one writes. Every thread (and every forked child) gets its own
+# connection. Values are pickled, and each row records when it was last
+# used so we can drop the least recently used ones once the file is full.
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+__all__ = ["PersistentCache"]
+
+_MISSING = object()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    kind      TEXT NOT NULL,
+    key       TEXT NOT NULL,
+    version   TEXT NOT NULL,
+    value     BLOB NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (kind, key, version)
+);
+CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used);
+"""
+
+_PRUNE_EVERY = 256      # writes between size checks
+_TOUCH_AFTER = 60.0     # seconds before a hit bothers to update last_used
+
+
+class PersistentCache:
+    """A bounded, process-safe key/value store in one SQLite file.
+
+    Keys are (kind, key) strings; rows written under a different version
+    are ignored, so bumping the version invalidates everything at once.
+    Errors from SQLite (a locked or broken file) count as misses rather
+    than failing the caller.
+    """
+
+    def __init__(self, path: str, version: str, max_entries: int = 100_000):
+        self.path = path
+        self.version = version
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes_since_prune = 0
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.errors = 0
+        self._conn().executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        # one connection per thread, and a fresh one after a fork
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, kind: str, key: str, default=_MISSING):
+        """The cached value for (kind, key), or default."""
+        try:
+            conn = self._conn()
+            row = conn.execute(
+                "SELECT value, last_used FROM entries WHERE kind = ? AND key = ? AND version = ?",
+                (kind, key, self.version)).fetchone()
+            if row is None:
+                self._count("misses")
+                return default
+            value = pickle.loads(row[0])
+            now = time.time()
+            if now - row[1] > _TOUCH_AFTER:
+                conn.execute(
+                    "UPDATE entries SET last_used = ? WHERE kind = ? AND key = ? AND version = ?",
+                    (now, kind, key, self.version))
+        except (sqlite3.Error, pickle.UnpicklingError, AttributeError, EOFError, ImportError):
+            self._count("errors")
+            self._count("misses")
+            return default
+        self._count("hits")
+        return value
+
+    def put(self, kind: str, key: str, value) -> None:
+        """Store value under (kind, key), pruning old rows now and then."""
+        try:
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            self._conn().execute(
+                "INSERT OR REPLACE INTO entries (kind, key, version, value, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (kind, key, self.version, blob, time.time()))
+        except (sqlite3.Error, pickle.PicklingError, TypeError, AttributeError):
+            self._count("errors")
+            return
+        self._count("writes")
+        with self._lock:
+            self._writes_since_prune += 1
+            due = self._writes_since_prune >= _PRUNE_EVERY
+            if due:
+                self._writes_since_prune = 0
+        if due:
+            self.prune()
+
+    def prune(self) -> int:
+        """Drop the least recently used rows beyond max_entries; returns how many."""
+        try:
+            conn = self._conn()
+            (count,) = conn.execute("SELECT COUNT(*) FROM entries").fetchone()
+            extra = count - self.max_entries
+            if extra <= 0:
+                return 0
+            conn.execute(
+                "DELETE FROM entries WHERE rowid IN "
+                "(SELECT rowid FROM entries ORDER BY last_used LIMIT ?)", (extra,))
+            return extra
+        except sqlite3.Error:
+            self._count("errors")
+            return 0
+
+    def clear(self) -> None:
+        """Delete every row (for every version)."""
+        try:
+            self._conn().execute("DELETE FROM entries")
+        except sqlite3.Error:
+            self._count("errors")
+
+    def info(self) -> dict:
+        try:
+            (entries,) = self._conn().execute("SELECT COUNT(*) FROM entries").fetchone()
+        except sqlite3.Error:
+            entries = None
+        with self._lock:
+            return {"path": self.path, "version": self.version, "entries": entries,
+                    "max_entries": self.max_entries, "hits": self.hits,
+                    "misses": self.misses, "writes": self.writes, "errors": self.errors}
+
+    def close(self) -> None:
+        """Close this thread's connection (others close when their thread ends)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            conn.close()
+        self._local.conn = None
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
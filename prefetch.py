@@ -0,0 +1,103 @@
+# prefetch.py — keep a few ready-to-go problems around so "New Problem" is instant
+#
+# For every kind of problem the user has asked for, a background thread keeps
+# a small queue topped up with problems that are already generated, solved and
+# explained. Popping one off is basically free; the thread then makes another.
+
+import queue
+import random
+import threading
+
+from main import generate_one_variable_problem, generate_two_variable_problem, generate_Calc_problem
+from solver import ProblemSession
+
+__all__ = ["ProblemPrefetcher", "algebra_key", "calc_key"]
+
+
+def algebra_key(num_variables: int, difficulty: str) -> tuple:
+    return ("algebra", num_variables, difficulty)
+
+
+def calc_key(calc_type: str) -> tuple:
+    # calc_type is 'D' or 'I', like generate_Calc_problem
+    return ("calc", calc_type)
+
+
+def _prepare(key: tuple, rng: random.Random) -> ProblemSession | None:
+    """A new problem for key, with its solutions and steps already worked out."""
+    if key[0] == "calc":
+        res = generate_Calc_problem(key[1], rng)
+        if not res:
+            return None
+        prob, sol = res
+        kind = "Derivative" if key[1] == "D" else "Integral"
+        session = ProblemSession(prob, solution=sol, calc_kind=kind)
+        session.steps()
+        return session
+
+    _, num_variables, difficulty = key
+    if num_variables == 1:
+        prob = generate_one_variable_problem(difficulty, rng)
+        solve_for = None
+    else:
+        prob = generate_two_variable_problem(difficulty, rng)
+        solve_for = "x"     # the GUI's default
+    if not prob:
+        return None
+    session = ProblemSession(prob, num_variables)
+    session.steps(solve_for)     # solves along the way
+    return session
+
+
+class ProblemPrefetcher:
+    """Bounded queues of prepared problems, refilled in the background.
+
+    Each key (see algebra_key / calc_key) gets its own daemon thread the
+    first time it's asked for, so one slow problem type can't hold up the
+    others.
+    """
+
+    def __init__(self, depth: int = 3):
+        self.depth = depth
+        self._queues: dict[tuple, queue.Queue] = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def watch(self, key: tuple) -> None:
+        """Start keeping a queue of problems for key (no-op if we already are)."""
+        with self._lock:
+            if key in self._queues or self._stopped.is_set():
+                return
+            q: queue.Queue = queue.Queue(maxsize=self.depth)
+            self._queues[key] = q
+        threading.Thread(target=self._fill, args=(key, q), daemon=True).start()
+
+    def get(self, key: tuple) -> ProblemSession | None:
+        """Pop a ready problem for key, or None if the queue is empty right now."""
+        self.watch(key)
+        try:
+            return self._queues[key].get_nowait()
+        except (KeyError, queue.Empty):
+            return None
+
+    def stop(self) -> None:
+        """Stop refilling (the threads exit after their current problem)."""
+        self._stopped.set()
+
+    def _fill(self, key: tuple, q: queue.Queue) -> None:
+        rng = random.Random()
+        while not self._stopped.is_set():
+            try:
+                item = _prepare(key, rng)
+            except Exception:
+                item = None
+            if item is None:
+                self._stopped.wait(0.5)   # don't spin on a key that can't make problems
+                continue
+            # blocks while the queue is full, waking up now and then to see if we should stop
+            while not self._stopped.is_set():
+                try:
+                    q.put(item, timeout=0.5)
+                    break
+                except queue.Full:
+                    pass
@@ -0,0 +1,55 @@
+# problem.py — a compact, structured form of a generated algebra problem
+#
+# The generators used to hand back f-strings like "3*x - 4/2 = 7", which the
+# solver then had to tokenize again. A Problem is just the pieces the string
+# was built from, as a tuple: ints for the numbers and short strs for the
+# variables and operators, e.g. (3, '*', 'x', '-', 4, '/', 2, '=', 7).
+#
+# It's a plain tuple underneath (no per-instance dict), the strs are shared
+# and small ints are cached by Python, so one costs about as much as an
+# empty tuple plus 8 bytes per token. That's small enough to keep millions
+# around while building a problem bank. str() gives back the usual text.
+
+__all__ = ["Problem"]
+
+# binary operators that get a space on each side when rendered
+_SPACED = {"+": " + ", "-": " - ", "=": " = "}
+
+
+class Problem(tuple):
+    """A generated problem as a tuple of tokens; str() renders the text.
+
+    Problem(3, '*', 'x', '-', 4, '=', 7) renders as "3*x - 4 = 7". Empty
+    strings are dropped, so generators can pass an optional variable that
+    wasn't picked. Negative ints are numbers ("x + -3"); a '+' or '-'
+    token is always a binary operator.
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, *tokens):
+        return super().__new__(cls, [t for t in tokens if t != ""])
+
+    def __getnewargs__(self):
+        # so pickle (and process pools) rebuild it from the tokens
+        return tuple(self)
+
+    def __str__(self) -> str:
+        return "".join(_SPACED.get(t, t) if isinstance(t, str) else str(t) for t in self)
+
+    def __repr__(self) -> str:
+        return f"Problem({str(self)!r})"
+
+    def tokens(self) -> list:
+        """The tokens mathparse.tokenize would give for str(self).
+
+        Negative numbers become '-' followed by the number, like in text.
+        """
+        out: list = []
+        for t in self:
+            if isinstance(t, int) and t < 0:
+                out.append("-")
+                out.append(-t)
+            else:
+                out.append(t)
+        return out
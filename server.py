@@ -0,0 +1,384 @@
+# server.py — the generators and the solver as a small local HTTP/JSON service
+#
+#   python server.py --port 8765 --workers 4
+#
+# Endpoints (all JSON):
+#
+#   GET  /health     {"ok": true}
+#   GET  /stats      request counters and limits
+#   POST /generate   {"kind": "algebra", "difficulty": "mixed", "variables": 1, "count": 10}
+#                    {"kind": "calc", "calc_type": "I", "count": 10, "seed": 3}
+#   POST /solve      {"problem": "x^2 = 9", "solve_for": null}
+#   POST /check      {"problem": "x^2 = 9", "answer": "3, -3", "num_variables": 1}
+#                    {"kind": "calc", "answer": "2*x", "solution": "2*x"}
+#                    {"kind": "calc", "problem": "Differentiate: x**2", "answer": "2*x"}
+#   POST /steps      {"problem": "x^2 = 9", "num_variables": 1}
+#                    {"kind": "calc", "problem": "Integrate: 2*x", "solution": "x**2"}
+#
+# A calculus item without a "solution" gets one worked out from its problem
+# text ("Differentiate: f" or "Integrate: f"), within the item's time budget.
+#
+# Any POST body can instead be {"items": [...]} with many of those objects;
+# the reply is then {"results": [...]} in the same order, and one bad item
+# only gets an {"error": ...} of its own.
+#
+# The event loop only does HTTP. All SymPy work runs in a process pool, in
+# chunks. At most --concurrency chunks run at once; at most --queue more
+# requests may wait for a turn, and anything past that gets 503 with
+# Retry-After straight away, so a flood of requests can't pile up memory or
+# latency. Connections are kept alive (HTTP/1.1) until the client closes
+# them or sits idle for --idle seconds.
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import sys
+import time
+
+__all__ = ["SolverServer", "run_item", "main"]
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+_MAX_HEADERS = 100
+_ENDPOINTS = ("generate", "solve", "check", "steps")
+
+
+class _HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+# work done in the pool processes
+#
+# Everything in and out is plain JSON-able data: problems and answers are
+# strings, and SymPy objects are turned into str() before they go back.
+
+def _calc_solution(item: dict):
+    """The item's "solution" field, parsed."""
+    import solver
+    from mathparse import calc_constants, parse_expr
+
+    return parse_expr(item["solution"], calc_constants(), {"x": solver.sp.Symbol("x")})
+
+
+def _generate(item: dict, max_count: int) -> dict:
+    import main
+    count = int(item.get("count", 1))
+    if not 1 <= count <= max_count:
+        raise ValueError(f"count must be between 1 and {max_count}")
+    seed = item.get("seed")
+    unique = bool(item.get("unique", False))
+    if item.get("kind", "algebra") == "calc":
+        pairs = main.generate_Calc_problems(count, item.get("calc_type", "D"), seed, unique)
+        return {"problems": [{"problem": p, "solution": str(s)} for p, s in pairs]}
+    difficulty = item.get("difficulty", "mixed")
+    if item.get("with_answers"):
+        keyed = main.generate_problems_with_answers(count, difficulty, seed, unique=unique)
+        return {"problems": [{"problem": p, "answers": [str(a) for a in answers]}
+                             for p, answers in keyed]}
+    variables = int(item.get("variables", 1))
+    return {"problems": main.generate_problems(count, difficulty, variables, seed,
+                                               unique=unique)}
+
+
+def run_item(endpoint: str, item: dict, timeout: float | None = None,
+             max_count: int = 1000) -> dict:
+    """Handle one request item; errors come back as {"error": ...}."""
+    import solver
+    try:
+        if not isinstance(item, dict):
+            raise TypeError("each item must be a JSON object")
+        if endpoint == "generate":
+            return _generate(item, max_count)
+
+        calc = item.get("kind") == "calc"
+        if endpoint == "solve":
+            sols = solver.solve_algebra(item["problem"], item.get("solve_for"), timeout=timeout)
+            return {"solutions": [{str(k): str(v) for k, v in sol.items()} for sol in sols],
+                    "answer": solver.format_solutions(sols)}
+        if endpoint == "check":
+            if calc and "solution" in item:
+                ok, message = solver.check_calc_answer(item["answer"], _calc_solution(item),
+                                                       timeout=timeout)
+            elif calc:
+                # no solution given: work one out from the problem, inside the budget
+                ok, message = solver.check_calc_problem(item["problem"], item["answer"],
+                                                        timeout=timeout)
+            else:
+                ok, message = solver.check_algebra_answer(
+                    item["problem"], item["answer"], int(item.get("num_variables", 1)),
+                    item.get("solve_for"), timeout=timeout)
+            return {"correct": ok, "message": message}
+        if endpoint == "steps":
+            if calc:
+                kind = item.get("calc_kind") or (
+                    "Integral" if item["problem"].startswith("Integrate") else "Derivative")
+                if "solution" in item:
+                    text = solver.calc_steps(item["problem"], _calc_solution(item), kind,
+                                             timeout=timeout)
+                else:
+                    text = solver.calc_problem_steps(item["problem"], kind, timeout=timeout)
+            else:
+                text = solver.algebra_steps(item["problem"], int(item.get("num_variables", 1)),
+                                            item.get("solve_for"), timeout=timeout)
+            return {"steps": text}
+        raise ValueError(f"unknown endpoint {endpoint!r}")
+    except KeyError as e:
+        return {"error": f"missing field {e.args[0]!r}"}
+    except (TypeError, ValueError) as e:
+        return {"error": str(e)}
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+
+
+def _run_chunk(endpoint: str, items: list, timeout: float | None, max_count: int) -> list:
+    return [run_item(endpoint, item, timeout, max_count) for item in items]
+
+
+# the server
+
+class SolverServer:
+    """asyncio HTTP front end over a process pool running solver.py.
+
+    workers: pool processes. concurrency: chunks of work running at once
+    (defaults to workers). queue: requests allowed to wait for a turn before
+    we start answering 503. chunk: items per pool job for batch requests.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, workers: int | None = None,
+                 concurrency: int | None = None, queue: int = 64, chunk: int = 16,
+                 max_items: int = 1000, max_body: int = 1 << 20, timeout: float | None = 10.0,
+                 idle: float = 15.0):
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        self.concurrency = concurrency or self.workers
+        self.queue = queue
+        self.chunk = chunk
+        self.max_items = max_items
+        self.max_body = max_body
+        self.timeout = timeout
+        self.idle = idle
+
+        self._pool = None
+        self._slots: asyncio.Semaphore | None = None
+        self._server = None
+        self._started = time.monotonic()
+        self.pending = 0        # requests admitted and not finished
+        self.counts = {"requests": 0, "items": 0, "rejected": 0, "errors": 0,
+                       "connections": 0}
+
+    # lifecycle
+
+    async def start(self) -> None:
+        from solver import worker_pool
+
+        self._pool = worker_pool(self.workers)
+        # a forked pool starts all its workers on the first job; do that
+        # before we listen, or they'd inherit client sockets and keep them
+        # open after we close them
+        await asyncio.get_running_loop().run_in_executor(self._pool, os.getpid)
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]    # if we asked for port 0
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        print(f"serving on http://{self.host}:{self.port} "
+              f"({self.workers} workers, concurrency {self.concurrency}, queue {self.queue})",
+              file=sys.stderr, flush=True)
+        loop = asyncio.get_running_loop()
+        stopped = loop.create_future()
+        try:
+            # stop on SIGTERM the same way as on Ctrl-C, shutting the pool down
+            loop.add_signal_handler(signal.SIGTERM, stopped.set_result, None)
+        except NotImplementedError:
+            pass    # Windows
+        try:
+            await stopped
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+        if self._pool is not None:
+            # running jobs are bounded by the solver budget, so waiting is short
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def stats(self) -> dict:
+        return {**self.counts, "pending": self.pending, "workers": self.workers,
+                "concurrency": self.concurrency, "queue": self.queue,
+                "uptime": round(time.monotonic() - self._started, 1)}
+
+    # HTTP
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.counts["connections"] += 1
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self._read_request(reader), self.idle)
+                except asyncio.TimeoutError:
+                    return      # idle keep-alive connection
+                if request is None:
+                    return
+                method, path, keep_alive, body = request
+                status, payload, extra = await self._respond(method, path, body)
+                writer.write(_encode(status, payload, keep_alive, extra))
+                await writer.drain()
+                if not keep_alive:
+                    return
+        except _HTTPError as e:
+            writer.write(_encode(e.status, {"error": e.message}, False))
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass    # client went away, or we're shutting down
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader):
+        line = await _readline(reader)
+        if not line:
+            return None
+        try:
+            method, target, version = line.decode("latin-1").split()
+        except ValueError:
+            raise _HTTPError(400, "malformed request line")
+
+        headers = {}
+        for _ in range(_MAX_HEADERS):
+            raw = await _readline(reader)
+            if raw in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = raw.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        else:
+            raise _HTTPError(400, "too many headers")
+
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            raise _HTTPError(400, "chunked bodies aren't supported; send Content-Length")
+        try:
+            length = int(headers.get("content-length", "0"))
+        except ValueError:
+            raise _HTTPError(400, "bad Content-Length")
+        if length < 0:
+            raise _HTTPError(400, "bad Content-Length")
+        if length > self.max_body:
+            raise _HTTPError(413, f"body over {self.max_body} bytes")
+        body = await reader.readexactly(length) if length else b""
+
+        connection = headers.get("connection", "").lower()
+        if version == "HTTP/1.0":
+            keep_alive = connection == "keep-alive"
+        else:
+            keep_alive = connection != "close"
+        return method, target.split("?", 1)[0], keep_alive, body
+
+    async def _respond(self, method: str, path: str, body: bytes):
+        """(status, payload, extra headers) for one request."""
+        self.counts["requests"] += 1
+        endpoint = path.strip("/")
+        if method == "GET" and endpoint == "health":
+            return 200, {"ok": True}, None
+        if method == "GET" and endpoint == "stats":
+            return 200, self.stats(), None
+        if endpoint not in _ENDPOINTS:
+            return 404, {"error": f"no endpoint {path}"}, None
+        if method != "POST":
+            return 405, {"error": "use POST"}, None
+
+        try:
+            data = json.loads(body or b"null")
+        except ValueError:
+            return 400, {"error": "body isn't valid JSON"}, None
+        batch = isinstance(data, dict) and "items" in data
+        items = data["items"] if batch else [data]
+        if not isinstance(items, list) or not items:
+            return 400, {"error": "items must be a non-empty list"}, None
+        if len(items) > self.max_items:
+            return 413, {"error": f"at most {self.max_items} items per request"}, None
+
+        # backpressure: only so many requests may be running or waiting
+        if self.pending >= self.concurrency + self.queue:
+            self.counts["rejected"] += 1
+            return 503, {"error": "server busy, try again shortly"}, {"Retry-After": "1"}
+
+        self.pending += 1
+        try:
+            results = await self._run(endpoint, items)
+        except Exception as e:
+            self.counts["errors"] += 1
+            return 500, {"error": f"{type(e).__name__}: {e}"}, None
+        finally:
+            self.pending -= 1
+        self.counts["items"] += len(items)
+        return 200, ({"results": results} if batch else results[0]), None
+
+    async def _run(self, endpoint: str, items: list) -> list:
+        loop = asyncio.get_running_loop()
+
+        async def run_chunk(chunk):
+            async with self._slots:
+                return await loop.run_in_executor(self._pool, _run_chunk, endpoint, chunk,
+                                                  self.timeout, self.max_items)
+
+        # small enough that one batch spreads over every slot
+        size = max(1, min(self.chunk, -(-len(items) // self.concurrency)))
+        chunks = [items[i:i + size] for i in range(0, len(items), size)]
+        done = await asyncio.gather(*(run_chunk(c) for c in chunks))
+        return [result for chunk in done for result in chunk]
+
+
+async def _readline(reader: asyncio.StreamReader) -> bytes:
+    try:
+        return await reader.readline()
+    except ValueError:      # longer than the stream's buffer limit
+        raise _HTTPError(400, "request line or header too long")
+
+
+def _encode(status: int, payload, keep_alive: bool, extra: dict | None = None) -> bytes:
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    head = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}",
+            "Content-Type: application/json; charset=utf-8",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+    for name, value in (extra or {}).items():
+        head.append(f"{name}: {value}")
+    return ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Serve the problem generators and solver over HTTP.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--workers", type=int, help="pool processes (default: CPU count)")
+    ap.add_argument("--concurrency", type=int, help="pool jobs at once (default: workers)")
+    ap.add_argument("--queue", type=int, default=64,
+                    help="requests that may wait for a turn before we answer 503")
+    ap.add_argument("--chunk", type=int, default=16, help="batch items per pool job")
+    ap.add_argument("--max-items", type=int, default=1000, help="items per request")
+    ap.add_argument("--timeout", type=float, default=10.0,
+                    help="per-item solver budget in seconds (0 for none)")
+    ap.add_argument("--idle", type=float, default=15.0,
+                    help="seconds before an idle keep-alive connection is closed")
+    args = ap.parse_args(argv)
+
+    server = SolverServer(args.host, args.port, args.workers, args.concurrency, args.queue,
+                          args.chunk, args.max_items, timeout=args.timeout or None,
+                          idle=args.idle)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
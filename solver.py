@@ -1,140 +1,772 @@
 # solver.py — parse, solve, check, and explain algebra / calculus problems
 # Needs: sympy  (pip install sympy)
 
+from __future__ import annotations
+
+import bisect
+import json
+import os
 import re
-import sympy as sp
+import sys
+import threading
+import time
+from collections import OrderedDict
+from functools import partial, wraps
+
+from lazy import is_available, lazy_import
+from linear import check_linear_answer, linear_steps, solve_linear
+from mathparse import calc_constants, parse_equation, parse_expr
+from problem import Problem
+
+# SymPy (and NumPy) only get imported the first time we actually need them
+sp = lazy_import("sympy")
+np = lazy_import("numpy") if is_available("numpy") else None  # numeric fast path is optional
 
 __all__ = [
     "find_variables",
     "solve_algebra",
+    "format_solutions",
     "check_algebra_answer",
     "check_calc_answer",
+    "calc_solution",
+    "check_calc_problem",
     "algebra_steps",
     "calc_steps",
+    "calc_problem_steps",
+    "parse_cache_info",
+    "set_parse_cache_size",
+    "clear_parse_cache",
+    "solution_cache_info",
+    "configure_solution_cache",
+    "clear_solution_cache",
+    "term_cache_info",
+    "clear_term_cache",
+    "SOLVER_VERSION",
+    "enable_disk_cache",
+    "disable_disk_cache",
+    "disk_cache_info",
+    "equivalence_stats",
+    "timeout_stats",
+    "stats",
+    "enable_stats",
+    "reset_stats",
+    "start_stats_dump",
+    "stop_stats_dump",
+    "worker_pool",
+    "run_many",
+    "solve_many",
+    "check_many",
+    "ProblemSession",
 ]
 
 
-# small helpers
+# caching
 
-def find_variables(equation_str: str) -> list[str]:
-    """Find all unique single-letter variables in the string."""
-    seen: list[str] = []
-    for ch in equation_str:
-        if ch.isalpha() and ch not in seen:
-            seen.append(ch)
-    return seen
+_MISSING = object()
 
 
-def _preprocess(eq_str: str) -> str:
-    """Turn our custom equation format into something SymPy can read.
+class _LRUCache:
+    """A small thread-safe LRU map that counts hits, misses and evictions.
 
-    Examples of fixes:
-      √9      -> sqrt(9)
-      ^       -> **
-      3x      -> 3*x
-      )x, )3  -> )*x, )*3
+    If ttl (seconds) is set, entries older than that count as misses.
     """
-    s = eq_str.strip()
 
-    # √<digits> -> sqrt(<digits>)
-    s = re.sub(r"√(\d+)", r"sqrt(\1)", s)
+    def __init__(self, maxsize: int = 256, ttl: float | None = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+
+    def get(self, key, default=_MISSING):
+        with self._lock:
+            try:
+                stamp, value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            if self.ttl is not None and time.monotonic() - stamp > self.ttl:
+                del self._data[key]
+                self.expired += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value) -> None:
+        with self._lock:
+            if self.maxsize <= 0:
+                return
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            self._trim()
+
+    def resize(self, maxsize: int) -> None:
+        with self._lock:
+            self.maxsize = maxsize
+            self._trim()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = self.expired = 0
+
+    def info(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses,
+                    "evictions": self.evictions, "expired": self.expired,
+                    "size": len(self._data), "maxsize": self.maxsize,
+                    "ttl": self.ttl}
+
+    def _trim(self) -> None:
+        while len(self._data) > max(self.maxsize, 0):
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+
+# parsed equations, keyed on the normalized problem string
+_PARSE_CACHE = _LRUCache(maxsize=512)
+
+
+def parse_cache_info() -> dict:
+    """Hit/miss/eviction counters and current size of the parse cache."""
+    return _PARSE_CACHE.info()
+
+
+def set_parse_cache_size(maxsize: int) -> None:
+    """Change how many parsed equations we keep (0 turns caching off)."""
+    _PARSE_CACHE.resize(maxsize)
+
+
+def clear_parse_cache() -> None:
+    """Drop every cached parse and reset the counters."""
+    _PARSE_CACHE.clear()
+
+
+# solutions, keyed on the canonical (expanded, sorted) sides plus the target
+_SOLUTION_CACHE = _LRUCache(maxsize=1024)
+
+
+def solution_cache_info() -> dict:
+    """Hit/miss/eviction/expiry counters and size of the solution cache."""
+    return _SOLUTION_CACHE.info()
+
+
+def configure_solution_cache(max_entries: int | None = None,
+                             ttl: float | None = _MISSING) -> None:
+    """Set the max number of cached solutions and/or their TTL in seconds.
+
+    Pass ttl=None to keep entries until they're evicted.
+    """
+    if ttl is not _MISSING:
+        _SOLUTION_CACHE.ttl = ttl
+    if max_entries is not None:
+        _SOLUTION_CACHE.resize(max_entries)
+
+
+def clear_solution_cache() -> None:
+    """Drop every cached solution and reset the counters."""
+    _SOLUTION_CACHE.clear()
+
+
+# per-stage timing
+#
+# Off by default (or set SOLVER_STATS=1). When it's off, each instrumented
+# stage costs one flag check. When it's on, every stage keeps a call count,
+# total and max time, and a coarse latency histogram, so we can see where
+# grading time goes under real load without a profiler.
+
+_stats_on = os.environ.get("SOLVER_STATS", "") not in ("", "0")
+_stats_lock = threading.Lock()
+_STAGES: dict[str, dict] = {}
+
+# histogram bucket upper bounds, in seconds
+_BUCKET_EDGES = (1e-4, 1e-3, 1e-2, 1e-1, 1.0, 10.0)
+_BUCKET_LABELS = ("<0.1ms", "<1ms", "<10ms", "<100ms", "<1s", "<10s", ">=10s")
+
+
+def enable_stats(on: bool = True) -> None:
+    """Turn per-stage timing on or off (the numbers so far are kept)."""
+    global _stats_on
+    _stats_on = on
+
+
+def reset_stats() -> None:
+    """Forget every stage timing collected so far."""
+    with _stats_lock:
+        _STAGES.clear()
+
+
+def _record(stage: str, seconds: float) -> None:
+    with _stats_lock:
+        entry = _STAGES.get(stage)
+        if entry is None:
+            entry = _STAGES[stage] = {"calls": 0, "total": 0.0, "max": 0.0,
+                                      "buckets": [0] * len(_BUCKET_LABELS)}
+        entry["calls"] += 1
+        entry["total"] += seconds
+        if seconds > entry["max"]:
+            entry["max"] = seconds
+        entry["buckets"][bisect.bisect_left(_BUCKET_EDGES, seconds)] += 1
+
+
+def _timed(stage: str, func, *args, **kwargs):
+    """func(*args, **kwargs), timed under stage when stats are on."""
+    if not _stats_on:
+        return func(*args, **kwargs)
+    start = time.perf_counter()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        _record(stage, time.perf_counter() - start)
+
+
+def _instrumented(func):
+    """Time every call of a public function as its own stage."""
+    name = func.__name__
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _stats_on:
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _record(name, time.perf_counter() - start)
+    return wrapper
+
+
+def stats() -> dict:
+    """Everything we count, in one dict.
+
+    "stages" maps each stage (parse, sympy_solve, simplify, ...) and each
+    public function to its calls, total/mean/max milliseconds and latency
+    histogram. The cache, answer-checker and time-budget counters are
+    included too.
+    """
+    with _stats_lock:
+        stages = {
+            name: {
+                "calls": e["calls"],
+                "total_ms": round(e["total"] * 1e3, 3),
+                "mean_ms": round(e["total"] * 1e3 / e["calls"], 3),
+                "max_ms": round(e["max"] * 1e3, 3),
+                "histogram": dict(zip(_BUCKET_LABELS, e["buckets"])),
+            }
+            for name, e in _STAGES.items()
+        }
+    return {
+        "enabled": _stats_on,
+        "stages": stages,
+        "parse_cache": parse_cache_info(),
+        "solution_cache": solution_cache_info(),
+        "term_cache": term_cache_info(),
+        "disk_cache": disk_cache_info(),
+        "equivalence": equivalence_stats(),
+        "timeouts": timeout_stats(),
+    }
+
+
+_dump_stop: threading.Event | None = None
+
+
+def start_stats_dump(interval: float = 60.0, path: str | None = None) -> None:
+    """Write stats() as one JSON line every interval seconds.
+
+    Lines are appended to path, or go to stderr if no path is given. This
+    also turns stats on. Calling it again replaces the previous dumper.
+    """
+    global _dump_stop
+    stop_stats_dump()
+    enable_stats(True)
+    stop = _dump_stop = threading.Event()
+
+    def dump():
+        while not stop.wait(interval):
+            line = json.dumps({"time": time.strftime("%Y-%m-%dT%H:%M:%S"), **stats()},
+                              default=str)
+            if path is None:
+                print(line, file=sys.stderr, flush=True)
+            else:
+                with open(path, "a", encoding="utf-8") as f:
+                    f.write(line + "\n")
+
+    threading.Thread(target=dump, name="solver-stats-dump", daemon=True).start()
+
+
+def stop_stats_dump() -> None:
+    """Stop the periodic dump started by start_stats_dump (if any)."""
+    global _dump_stop
+    if _dump_stop is not None:
+        _dump_stop.set()
+        _dump_stop = None
 
-    # ^ -> **
-    s = s.replace("^", "**")
 
-    # number right next to a variable means multiply
-    s = re.sub(r"(\d)([a-zA-Z])", r"\1*\2", s)
+# calculus terms, keyed on (term, "Derivative" | "Integral") -> (result, rule)
+_TERM_CACHE = _LRUCache(maxsize=2048)
 
-    # ) right next to a variable/number means multiply
-    s = re.sub(r"\)([a-zA-Z0-9])", r")*\1", s)
 
-    # Just in case we accidentally messed up "sqrt"
-    for bad in ("s*q*r*t", "s*qrt", "sq*rt", "sqr*t"):
-        s = s.replace(bad, "sqrt")
+def term_cache_info() -> dict:
+    """Hit/miss/eviction counters and size of calc_steps' per-term cache."""
+    return _TERM_CACHE.info()
 
-    return s
 
+def clear_term_cache() -> None:
+    """Drop every cached calculus term and reset the counters."""
+    _TERM_CACHE.clear()
 
-def _parse_equation(problem_str: str):
+
+# on-disk cache
+#
+# Optional, and off unless enable_disk_cache() is called or SOLVER_CACHE
+# points at a file. It sits in front of solve_algebra, algebra_steps and
+# calc_steps, so a problem solved yesterday (or by another worker process)
+# comes back without any SymPy work. Rows are tied to SOLVER_VERSION and the
+# installed SymPy version; bump SOLVER_VERSION whenever answers or step
+# text change so stale rows stop being used.
+
+SOLVER_VERSION = "3"
+
+_DISK_CACHE = None
+
+
+def enable_disk_cache(path: str = "solver_cache.sqlite3", max_entries: int = 100_000) -> None:
+    """Start using (and filling) the SQLite cache at path."""
+    global _DISK_CACHE
+    from importlib.metadata import PackageNotFoundError, version
+    from persist import PersistentCache      # sqlite3 isn't needed unless we get here
+
+    try:
+        sympy_version = version("sympy")
+    except PackageNotFoundError:
+        sympy_version = "?"
+    _DISK_CACHE = PersistentCache(path, f"{SOLVER_VERSION}/sympy-{sympy_version}", max_entries)
+
+
+def disable_disk_cache() -> None:
+    """Stop using the on-disk cache (the file is left alone)."""
+    global _DISK_CACHE
+    if _DISK_CACHE is not None:
+        _DISK_CACHE.close()
+    _DISK_CACHE = None
+
+
+def disk_cache_info() -> dict | None:
+    """Entries and hit/miss/write counters for the on-disk cache, or None if it's off."""
+    return _DISK_CACHE.info() if _DISK_CACHE is not None else None
+
+
+def _disk_key(problem, *rest) -> str:
+    return "\x1f".join([_normalize_problem(str(problem))] + [str(part) for part in rest])
+
+
+def _disk_get(kind: str, problem, *rest):
+    if _DISK_CACHE is None:
+        return _MISSING
+    return _timed("disk_cache", _DISK_CACHE.get, kind, _disk_key(problem, *rest), _MISSING)
+
+
+def _disk_put(kind: str, value, problem, *rest) -> None:
+    if _DISK_CACHE is not None:
+        _DISK_CACHE.put(kind, _disk_key(problem, *rest), value)
+
+
+if os.environ.get("SOLVER_CACHE"):
+    enable_disk_cache(os.environ["SOLVER_CACHE"])
+
+
+# time budgets
+#
+# Every public function takes an optional timeout (seconds). When it's set,
+# the real work runs in a child process that we simply kill if it runs
+# over, and the caller gets the usual "can't tell" answer instead.
+
+_TIMEOUT_COUNTS: dict[str, dict[str, int]] = {}
+
+
+def timeout_stats() -> dict:
+    """Per function: how many calls had a budget and how many ran out."""
+    return {name: dict(counts) for name, counts in _TIMEOUT_COUNTS.items()}
+
+
+def _mp_context():
+    import multiprocessing   # not needed at startup
+
+    # fork is much cheaper to start and the child keeps our caches
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+
+def _budget_worker(conn, func, args, kwargs):
+    try:
+        conn.send((True, func(*args, **kwargs)))
+    except Exception as e:
+        conn.send((False, e))
+    finally:
+        conn.close()
+
+
+def _with_budget(func, args: tuple, kwargs: dict, timeout: float, fallback):
+    """Call func(*args, **kwargs) but give up after timeout seconds."""
+    counts = _TIMEOUT_COUNTS.setdefault(func.__name__, {"calls": 0, "timeouts": 0})
+    counts["calls"] += 1
+
+    ctx = _mp_context()
+    recv_end, send_end = ctx.Pipe(duplex=False)
+    proc = ctx.Process(target=_budget_worker, args=(send_end, func, args, kwargs),
+                       daemon=True)
+    proc.start()
+    send_end.close()
+    try:
+        if recv_end.poll(timeout):
+            ok, value = recv_end.recv()
+            if ok:
+                return value
+            raise value
+        counts["timeouts"] += 1
+        return fallback
+    except EOFError:
+        # the child died without answering
+        return fallback
+    finally:
+        if proc.is_alive():
+            proc.terminate()
+        proc.join()
+        recv_end.close()
+
+
+# small helpers
+
+def find_variables(equation_str: str) -> list[str]:
+    """Find all unique single-letter variables in the string."""
+    seen: list[str] = []
+    for ch in equation_str:
+        if ch.isalpha() and ch not in seen:
+            seen.append(ch)
+    return seen
+
+
+def _normalize_problem(problem_str: str) -> str:
+    """Trim and collapse runs of whitespace so equal problems share a key."""
+    return " ".join(problem_str.split())
+
+
+def _parse_equation(problem_str: str | Problem):
     """Turn "lhs = rhs" into a SymPy Eq plus the variables used.
 
+    Results are cached, so asking again for the same problem is cheap.
+    A Problem from the generators is already tokenized and is its own key.
     Returns (equation, symbol_list). If parsing fails: (None, []).
     """
-    if "=" not in problem_str:
-        return None, []
+    if isinstance(problem_str, Problem):
+        key = problem_str
+    else:
+        key = _normalize_problem(problem_str)
+    cached = _PARSE_CACHE.get(key)
+    if cached is not _MISSING:
+        eq, syms = cached
+        return eq, list(syms)
 
-    lhs_raw, rhs_raw = problem_str.split("=", 1)
-    lhs_s = _preprocess(lhs_raw)
-    rhs_s = _preprocess(rhs_raw)
+    eq, syms = _parse_equation_uncached(key)
+    _PARSE_CACHE.put(key, (eq, tuple(syms)))
+    return eq, syms
 
-    var_names = find_variables(problem_str)
-    symbols = {v: sp.Symbol(v) for v in var_names}
-    local_dict = {**symbols, "sqrt": sp.sqrt}
 
+def _parse_equation_uncached(problem_str: str):
+    if "=" not in problem_str:
+        return None, []
+
+    # mathparse handles √, ^, implicit multiplication etc. in one pass
     try:
-        lhs = sp.sympify(lhs_s, locals=local_dict)
-        rhs = sp.sympify(rhs_s, locals=local_dict)
+        lhs, rhs, syms = _timed("parse", parse_equation, problem_str)
     except Exception:
         return None, []
 
-    return sp.Eq(lhs, rhs), [symbols[v] for v in var_names]
+    return sp.Eq(lhs, rhs), syms
 
 
 # algebra solving
 
-def solve_algebra(problem_str: str, solve_for: str | None = None):
-    """Solve an algebra equation.
+@_instrumented
+def solve_algebra(problem_str: str | Problem, solve_for: str | None = None,
+                  timeout: float | None = None):
+    """Solve an algebra equation (text, or a Problem from the generators).
 
     If solve_for is given (like "x"), we solve for that variable.
     Otherwise we solve for all variables we found.
 
-    Returns a list of solution dicts (SymPy style), or [] if it fails.
+    Returns a list of solution dicts (SymPy style), or [] if it fails
+    or takes longer than timeout seconds.
     """
-    eq, syms = _parse_equation(problem_str)
+    return _solve_problem(problem_str, solve_for, timeout=timeout)
+
+
+def _solve_problem(problem_str: str | Problem, solve_for: str | None,
+                   parsed: tuple | None = None, timeout: float | None = None):
+    """solve_algebra's work, for it and ProblemSession.
+
+    parsed is the problem's (eq, syms) if the caller already has it.
+    """
+    # linear A/S and M/D problems don't need SymPy to be solved
+    solved = _solve_linear(problem_str, solve_for)
+    if solved is not None:
+        return solved
+
+    cached = _disk_get("solve", problem_str, solve_for)
+    if cached is not _MISSING:
+        return cached
+
+    if timeout is not None:
+        # the child process stores what it finds in the disk cache itself
+        return _with_budget(solve_algebra, (problem_str, solve_for), {}, timeout, [])
+
+    eq, syms = parsed if parsed is not None else _parse_equation(problem_str)
     if eq is None:
         return []
+    sols = _solve_parsed(eq, syms, solve_for)
+    _disk_put("solve", sols, problem_str, solve_for)
+    return sols
+
+
+def _solve_linear(problem_str: str, solve_for: str | None):
+    """solve_algebra's answer from the linear engine, or None if it can't help."""
+    solved = _timed("linear", solve_linear, problem_str, solve_for)
+    if solved is None:
+        return None
+    var, value = solved
+    return [{sp.Symbol(var): _linear_to_sympy(value)}]
+
+
+def _linear_to_sympy(form: dict) -> sp.Expr:
+    """Turn a linear form from linear.py into a SymPy expression."""
+    return sp.Add(*[sp.Rational(v.numerator, v.denominator) * (sp.Symbol(k) if k else 1)
+                    for k, v in form.items()])
+
+
+def _canonical_form(eq: sp.Eq) -> tuple:
+    """Both sides expanded, in sorted order so "a = b" and "b = a" match.
+
+    The sides stay apart on purpose: lhs - rhs would cancel terms like 2/x
+    that are on both sides, and "x^3 + 2/x = 2/x" (no solution) would then
+    share a key with "x^3 = 0".
+    """
+    return tuple(sorted((sp.expand(eq.lhs), sp.expand(eq.rhs)), key=sp.default_sort_key))
+
+
+def _solve_parsed(eq: sp.Eq, syms: list, solve_for: str | None = None):
+    """solve_algebra for an equation we already parsed, going through the cache."""
+    try:
+        key = (_timed("canonical_form", _canonical_form, eq), solve_for or tuple(syms))
+    except Exception:
+        key = None
+
+    if key is not None:
+        cached = _SOLUTION_CACHE.get(key)
+        if cached is not _MISSING:
+            return [dict(sol) for sol in cached]
+
     try:
         if solve_for:
             target = sp.Symbol(solve_for)
-            sols = sp.solve(eq, target, dict=True)
+        elif len(syms) == 1:
+            target = syms[0]
         else:
-            sols = sp.solve(eq, syms, dict=True)
-        return sols if sols else []
+            target = None
+        sols = _timed("fast_solve", _fast_solve, eq, target) if target is not None else None
+        if sols is None:
+            sols = _timed("sympy_solve", sp.solve, eq, target if solve_for else syms, dict=True)
     except Exception:
         return []
+    sols = sols if sols else []
+
+    if key is not None:
+        _SOLUTION_CACHE.put(key, [dict(sol) for sol in sols])
+    return sols
+
+
+def _fast_solve(eq: sp.Eq, target: sp.Symbol):
+    """Solve linear/quadratic equations in target with the textbook formulas.
+
+    Returns solution dicts like sp.solve(..., dict=True), or None if the
+    equation isn't a degree 1 or 2 polynomial in target with rational
+    coefficients and we should fall back to sp.solve.
+    """
+    if not isinstance(eq, sp.Equality):
+        return None
+    # lhs - rhs would cancel terms like 3/x on both sides, and then we'd
+    # return roots where the original equation isn't even defined
+    if not (eq.lhs.is_polynomial(target) and eq.rhs.is_polynomial(target)):
+        return None
+    poly = sp.expand(eq.lhs - eq.rhs).as_poly(target)
+    if poly is None:
+        return None
+    # with other variables (6/y + 2*x = -2) or radicals (x√6 + 7x = 2) in the
+    # coefficients, -b/a and the quadratic formula come out unsimplified;
+    # sp.solve tidies those and rationalizes the denominators
+    coeffs = poly.all_coeffs()
+    if not all(c.is_Rational for c in coeffs):
+        return None
+
+    deg = poly.degree()
+    if deg == 1:
+        a, b = coeffs
+        return [{target: -b / a}]
+    if deg == 2:
+        a, b, c = coeffs
+        disc = b**2 - 4*a*c
+        if disc == 0:
+            return [{target: -b / (2*a)}]
+        root = sp.sqrt(disc)
+        # in the same order sp.solve gives them
+        roots = sorted([(-b - root) / (2*a), (-b + root) / (2*a)], key=sp.default_sort_key)
+        return [{target: r} for r in roots]
+    return None
+
+
+# answer equivalence
+#
+# sp.simplify is the slow part of grading, so we first plug a few random
+# points into both expressions. Any clear mismatch settles it right away;
+# simplify only runs to confirm something that already looks equal.
+
+_PROBE_POINTS = 8
+_PROBE_TOL = 1e-7
+_probe_rng = None   # made on first use so importing solver doesn't load NumPy
+
+_EQUIV_COUNTS = {
+    "numeric_reject": 0,     # probe found a mismatch, no simplify needed
+    "numeric_unsure": 0,     # probe couldn't evaluate, fell through
+    "symbolic_confirm": 0,   # simplify agreed the answers match
+    "symbolic_reject": 0,    # simplify said no after all
+}
+
+
+def equivalence_stats() -> dict:
+    """How often each tier of the answer checker settled the question."""
+    return dict(_EQUIV_COUNTS)
+
+
+def _numeric_probe(a: sp.Expr, b: sp.Expr):
+    """Compare a and b numerically at a few points.
+
+    Returns False on a clear mismatch, True if every point agrees,
+    or None if we couldn't evaluate them.
+    """
+    try:
+        syms = sorted(a.free_symbols | b.free_symbols, key=str)
+        if not syms:
+            va, vb = complex(a.evalf()), complex(b.evalf())
+            return abs(va - vb) <= _PROBE_TOL * max(1.0, abs(va), abs(vb))
+        if np is None:
+            return None
+        global _probe_rng
+        if _probe_rng is None:
+            _probe_rng = np.random.default_rng(2024)
+
+        f = sp.lambdify(syms, [a, b], modules="numpy")
+        # complex points keep sqrt/log of negatives from turning into nan
+        shape = (len(syms), _PROBE_POINTS)
+        pts = (_probe_rng.uniform(0.5, 2.5, shape)
+               + 1j * _probe_rng.uniform(-0.5, 0.5, shape))
+        with np.errstate(all="ignore"):
+            va, vb = f(*pts)
+            va = np.broadcast_to(np.asarray(va, dtype=complex), (_PROBE_POINTS,))
+            vb = np.broadcast_to(np.asarray(vb, dtype=complex), (_PROBE_POINTS,))
+            ok = np.isfinite(va) & np.isfinite(vb)
+            if not ok.any():
+                return None
+            va, vb = va[ok], vb[ok]
+            scale = np.maximum(1.0, np.maximum(np.abs(va), np.abs(vb)))
+            return bool(np.all(np.abs(va - vb) <= _PROBE_TOL * scale))
+    except Exception:
+        return None
+
+
+def _equivalent(a: sp.Expr, b: sp.Expr) -> bool:
+    """True if a and b are the same expression mathematically."""
+    verdict = _timed("numeric_probe", _numeric_probe, a, b)
+    if verdict is False:
+        _EQUIV_COUNTS["numeric_reject"] += 1
+        return False
+    if verdict is None:
+        _EQUIV_COUNTS["numeric_unsure"] += 1
+
+    try:
+        same = _timed("simplify", sp.simplify, a - b) == 0
+    except Exception:
+        same = False
+    _EQUIV_COUNTS["symbolic_confirm" if same else "symbolic_reject"] += 1
+    return same
 
 
 # answer checking
 
+_TOO_SLOW = "Sorry - this problem took too long to check."
+_NO_SOLUTION = "Sorry - the solver couldn't find a solution for this problem."
+
+
+@_instrumented
 def check_algebra_answer(problem_str: str, user_input: str, num_variables: int,
-                         solve_for: str | None = None):
+                         solve_for: str | None = None, timeout: float | None = None):
     """Check a user's algebra answer.
 
     Returns (is_correct, message)
       - is_correct is True/False
-      - or None if we can't really tell
+      - or None if we can't really tell (or it took over timeout seconds)
     """
     if not user_input.strip():
         return None, "Please enter an answer."
 
+    quick = _timed("linear", check_linear_answer, problem_str, user_input, num_variables,
+                   solve_for)
+    if quick is not None:
+        return quick
+
+    if timeout is not None:
+        return _with_budget(check_algebra_answer,
+                            (problem_str, user_input, num_variables, solve_for), {},
+                            timeout, (None, _TOO_SLOW))
+
     solutions = solve_algebra(problem_str, solve_for=solve_for)
     if not solutions:
-        return None, "Sorry - the solver couldn't find a solution for this problem."
+        return None, _NO_SOLUTION
+    syms = None
+    if num_variables != 1:
+        eq, syms = _parse_equation(problem_str)
+        if eq is None:
+            return None, "Couldn't parse the problem."
+    return _grade_algebra(user_input, num_variables, solve_for, solutions,
+                          format_solutions(solutions), syms)
+
 
-    # Make a readable "correct answer" string for feedback
+def format_solutions(solutions: list) -> str:
+    """Readable "correct answer" string for feedback, like "x = 2  or  x = 3"."""
     sol_strs = []
     for sol_dict in solutions:
         parts = [f"{v} = {expr}" for v, expr in sol_dict.items()]
         sol_strs.append(", ".join(parts))
-    correct_display = "  or  ".join(sol_strs)
+    return "  or  ".join(sol_strs)
 
+
+def _grade_algebra(user_input: str, num_variables: int, solve_for: str | None,
+                   solutions: list, correct_display: str, syms: list | None):
+    """The part of check_algebra_answer that runs once we have the solutions.
+
+    syms (the problem's variables) is only needed for 2-variable problems.
+    """
     # 1-variable: user should give number(s)
     if num_variables == 1:
         # Collect the correct numeric answers (could be more than one)
         correct_values: list[sp.Expr] = []
         for sol_dict in solutions:
             for expr in sol_dict.values():
-                correct_values.append(sp.nsimplify(expr))
+                correct_values.append(_timed("nsimplify", sp.nsimplify, expr))
 
         # User might type multiple answers separated by commas/semicolons
         user_parts = re.split(r"[,;]", user_input)
@@ -143,16 +775,16 @@ def check_algebra_answer(problem_str: str, user_input: str, num_variables: int,
             part = part.strip()
             # allow "x = ..." but we only want the right side
             part = re.sub(r"^[a-zA-Z]\s*=\s*", "", part)
-            part = _preprocess(part)
             try:
-                user_values.append(sp.nsimplify(sp.sympify(part)))
+                user_values.append(_timed("nsimplify", sp.nsimplify,
+                                          _timed("parse_answer", parse_expr, part)))
             except Exception:
                 return False, f"Couldn't parse your answer \"{part}\".\nCorrect answer: {correct_display}"
 
         # Check if every user value matches some correct value
         matched_all = True
         for uv in user_values:
-            if not any(sp.simplify(uv - cv) == 0 for cv in correct_values):
+            if not any(_equivalent(uv, cv) for cv in correct_values):
                 matched_all = False
                 break
 
@@ -169,10 +801,6 @@ def check_algebra_answer(problem_str: str, user_input: str, num_variables: int,
 
     # 2-variable: user should give one variable in terms of the other
     else:
-        eq, syms = _parse_equation(problem_str)
-        if eq is None:
-            return None, "Couldn't parse the problem."
-
         target = sp.Symbol(solve_for) if solve_for else None
 
         user_clean = user_input.strip()
@@ -192,69 +820,186 @@ def check_algebra_answer(problem_str: str, user_input: str, num_variables: int,
                 f"Correct answer: {correct_display}"
             )
 
-        expr_str = _preprocess(expr_str)
-        local_dict = {str(s): s for s in syms}
-        local_dict["sqrt"] = sp.sqrt
         try:
-            user_expr = sp.sympify(expr_str, locals=local_dict)
+            user_expr = _timed("parse_answer", parse_expr, expr_str,
+                               symbols={str(s): s for s in syms})
         except Exception:
             return False, f"Couldn't parse your expression.\nCorrect answer: {correct_display}"
 
         # Compare user expression to each solution we found
         for sol_dict in solutions:
             if var_sym in sol_dict:
-                if sp.simplify(user_expr - sol_dict[var_sym]) == 0:
+                if _equivalent(user_expr, sol_dict[var_sym]):
                     return True, "Correct! ✓"
         return False, f"Not quite.\nCorrect answer: {correct_display}"
 
 
-def check_calc_answer(user_input: str, correct_solution: sp.Expr):
+@_instrumented
+def check_calc_answer(user_input: str, correct_solution: sp.Expr,
+                      timeout: float | None = None):
     """Check a user's calculus answer (derivative/integral result).
 
-    Returns (is_correct, message).
+    Returns (is_correct, message), or (None, message) if it took over
+    timeout seconds.
     """
     if not user_input.strip():
         return None, "Please enter an answer."
+    if timeout is not None:
+        return _with_budget(check_calc_answer, (user_input, correct_solution), {},
+                            timeout, (None, _TOO_SLOW))
 
     x = sp.Symbol("x")
-    user_clean = _preprocess(user_input.strip())
 
-    # Let users type common math names (sin, ln, pi, etc.)
-    local_dict = {"x": x, "sqrt": sp.sqrt,
-                  "sin": sp.sin, "cos": sp.cos, "tan": sp.tan,
-                  "exp": sp.exp, "log": sp.log, "ln": sp.log,
-                  "e": sp.E, "pi": sp.pi}
+    # Let users type common math names (sin, ln, pi, e, etc.)
     try:
-        user_expr = sp.sympify(user_clean, locals=local_dict)
+        user_expr = _timed("parse_answer", parse_expr, user_input.strip(), calc_constants(),
+                           {"x": x})
     except Exception:
         return None, f"Couldn't parse your answer."
 
+    pretty_sol = sp.pretty(correct_solution, use_unicode=True)
+
+    # Plug in sample points first; only an apparent match goes on to simplify
+    verdict = _timed("numeric_probe", _calc_probe, user_expr, correct_solution, x)
+    if verdict is False:
+        _EQUIV_COUNTS["numeric_reject"] += 1
+        return False, f"Not quite.\nCorrect answer: {pretty_sol}"
+    if verdict is None:
+        _EQUIV_COUNTS["numeric_unsure"] += 1
+
     # Exact match after simplifying
-    diff = sp.simplify(sp.expand(user_expr) - sp.expand(correct_solution))
-    if diff == 0:
-        return True, "Correct! ✓"
+    if verdict != "constant":
+        diff = _timed("simplify", sp.simplify, sp.expand(user_expr) - sp.expand(correct_solution))
+        if diff == 0:
+            _EQUIV_COUNTS["symbolic_confirm"] += 1
+            return True, "Correct! ✓"
 
     # For integrals: answers can differ by a constant, so compare derivatives
-    if sp.simplify(sp.diff(user_expr - correct_solution, x)) == 0:
+    if _timed("simplify", sp.simplify, sp.diff(user_expr - correct_solution, x)) == 0:
+        _EQUIV_COUNTS["symbolic_confirm"] += 1
         return True, "Correct (equivalent up to a constant)! ✓"
 
-    pretty_sol = sp.pretty(correct_solution, use_unicode=True)
+    _EQUIV_COUNTS["symbolic_reject"] += 1
     return False, f"Not quite.\nCorrect answer: {pretty_sol}"
 
 
+def calc_solution(problem_str: str) -> sp.Expr:
+    """Work out the answer to one of our problems, like "Integrate: 2*x".
+
+    Raises ValueError for anything that isn't "Differentiate: ..." or
+    "Integrate: ...", or that SymPy can't integrate.
+    """
+    verb, colon, f = problem_str.partition(":")
+    verb = verb.strip()
+    if not colon or verb not in ("Differentiate", "Integrate"):
+        raise ValueError(f"can't work out a solution for {problem_str!r}")
+    x = sp.Symbol("x")
+    expr = _timed("parse", parse_expr, f.strip(), calc_constants(), {"x": x})
+    if verb == "Differentiate":
+        return sp.diff(expr, x)
+    solution = sp.integrate(expr, x)
+    if solution.has(sp.Integral):
+        raise ValueError(f"couldn't integrate {f.strip()}")
+    return solution
+
+
+def check_calc_problem(problem_str: str, user_input: str, timeout: float | None = None):
+    """check_calc_answer against the answer calc_solution works out.
+
+    Working out the answer counts against the same timeout as the check.
+    """
+    if not user_input.strip():
+        return None, "Please enter an answer."
+    if timeout is not None:
+        return _with_budget(check_calc_problem, (problem_str, user_input), {},
+                            timeout, (None, _TOO_SLOW))
+    return check_calc_answer(user_input, calc_solution(problem_str))
+
+
+def _calc_probe(user_expr: sp.Expr, correct: sp.Expr, x: sp.Symbol):
+    """Compare a calculus answer with the reference at sample points x > 0.
+
+    Returns True if they agree everywhere, "constant" if they differ by
+    the same amount everywhere (fine for an integral), False if neither,
+    or None if we couldn't evaluate them.
+    """
+    try:
+        if np is None or not (user_expr.free_symbols | correct.free_symbols) <= {x}:
+            return None
+        global _probe_rng
+        if _probe_rng is None:
+            _probe_rng = np.random.default_rng(2024)
+
+        f = sp.lambdify(x, [user_expr, correct], modules="numpy")
+        # x > 0 keeps log(x) (and x**(1/2) etc.) real and defined
+        pts = _probe_rng.uniform(0.5, 3.0, _PROBE_POINTS)
+        with np.errstate(all="ignore"):
+            va, vb = f(pts)
+            va = np.broadcast_to(np.asarray(va, dtype=complex), (_PROBE_POINTS,))
+            vb = np.broadcast_to(np.asarray(vb, dtype=complex), (_PROBE_POINTS,))
+            ok = np.isfinite(va) & np.isfinite(vb)
+            if ok.sum() < 2:
+                return None
+            va, vb = va[ok], vb[ok]
+            scale = np.maximum(1.0, np.maximum(np.abs(va), np.abs(vb)))
+            diff = va - vb
+            if np.all(np.abs(diff) <= _PROBE_TOL * scale):
+                return True
+            if np.all(np.abs(diff - diff[0]) <= _PROBE_TOL * scale):
+                return "constant"
+            return False
+    except Exception:
+        return None
+
+
 # step-by-step explanations
 
+_STEPS_TOO_SLOW = "The solver ran out of time on this problem."
+
+
+@_instrumented
 def algebra_steps(problem_str: str, num_variables: int,
-                  solve_for: str | None = None) -> str:
+                  solve_for: str | None = None, timeout: float | None = None) -> str:
     """Make a readable step-by-step explanation for an algebra problem.
 
     For 2-variable problems, solve_for picks which variable to isolate.
     """
-    eq, syms = _parse_equation(problem_str)
+    return _algebra_steps(problem_str, num_variables, solve_for, timeout=timeout)
+
+
+def _algebra_steps(problem_str: str, num_variables: int, solve_for: str | None,
+                   parsed: tuple | None = None, solutions: list | None = None,
+                   timeout: float | None = None) -> str:
+    """algebra_steps' work, for it and ProblemSession.
+
+    parsed is the problem's (eq, syms) and solutions its solution list,
+    if the caller already has them.
+    """
+    quick = _timed("linear", linear_steps, problem_str, num_variables, solve_for)
+    if quick is not None:
+        return quick
+
+    cached = _disk_get("algebra_steps", problem_str, num_variables, solve_for)
+    if cached is not _MISSING:
+        return cached
+
+    if timeout is not None:
+        return _with_budget(algebra_steps, (problem_str, num_variables, solve_for), {},
+                            timeout, _STEPS_TOO_SLOW)
+
+    eq, syms = parsed if parsed is not None else _parse_equation(problem_str)
     if eq is None:
         return "Could not parse the equation."
+    if solutions is None:
+        solutions = _solve_parsed(eq, syms, solve_for)
+    text = _render_algebra_steps(problem_str, eq, syms, solve_for, solutions)
+    _disk_put("algebra_steps", text, problem_str, num_variables, solve_for)
+    return text
 
-    solutions = solve_algebra(problem_str, solve_for=solve_for)
+
+def _render_algebra_steps(problem_str: str, eq: sp.Eq, syms: list,
+                          solve_for: str | None, solutions: list) -> str:
+    """The part of algebra_steps that runs once the equation is parsed and solved."""
     if not solutions:
         return "The solver could not find a solution."
 
@@ -279,7 +1024,7 @@ def algebra_steps(problem_str: str, num_variables: int,
     lines.append(f"   {lhs_minus_rhs} = 0")
 
     # Step 3: try factoring/collecting if it actually changes something
-    factored = sp.factor(lhs_minus_rhs)
+    factored = _timed("factor", sp.factor, lhs_minus_rhs)
     if factored != lhs_minus_rhs:
         lines.append("")
         lines.append(f"Step 3 ▸ Factor / simplify")
@@ -315,7 +1060,7 @@ def algebra_steps(problem_str: str, num_variables: int,
             except Exception:
                 pass
 
-            simplified = sp.nsimplify(expr)
+            simplified = _timed("nsimplify", sp.nsimplify, expr)
             lines.append(f"   ➜  {var} = {simplified}")
             step_num += 1
 
@@ -328,8 +1073,32 @@ def algebra_steps(problem_str: str, num_variables: int,
     return "\n".join(lines)
 
 
-def calc_steps(problem_str: str, solution: sp.Expr, calc_kind: str) -> str:
+@_instrumented
+def calc_steps(problem_str: str, solution: sp.Expr, calc_kind: str,
+               timeout: float | None = None) -> str:
     """Make a step-by-step explanation for a calculus problem."""
+    cached = _disk_get("calc_steps", problem_str, solution, calc_kind)
+    if cached is not _MISSING:
+        return cached
+
+    if timeout is not None:
+        return _with_budget(calc_steps, (problem_str, solution, calc_kind), {},
+                            timeout, _STEPS_TOO_SLOW)
+
+    text = _render_calc_steps(problem_str, solution, calc_kind)
+    _disk_put("calc_steps", text, problem_str, solution, calc_kind)
+    return text
+
+
+def calc_problem_steps(problem_str: str, calc_kind: str, timeout: float | None = None) -> str:
+    """calc_steps for the answer calc_solution works out, all in one budget."""
+    if timeout is not None:
+        return _with_budget(calc_problem_steps, (problem_str, calc_kind), {},
+                            timeout, _STEPS_TOO_SLOW)
+    return calc_steps(problem_str, calc_solution(problem_str), calc_kind)
+
+
+def _render_calc_steps(problem_str: str, solution: sp.Expr, calc_kind: str) -> str:
     x = sp.Symbol("x")
 
     # Pull out just the math part if the string starts with a label
@@ -340,11 +1109,8 @@ def calc_steps(problem_str: str, solution: sp.Expr, calc_kind: str) -> str:
     else:
         expr_str = problem_str
 
-    local_dict = {"x": x, "sqrt": sp.sqrt,
-                  "sin": sp.sin, "cos": sp.cos, "tan": sp.tan,
-                  "exp": sp.exp, "log": sp.log, "e": sp.E, "pi": sp.pi}
     try:
-        expr = sp.sympify(expr_str, locals=local_dict)
+        expr = _timed("parse", parse_expr, expr_str, calc_constants(), {"x": x})
     except Exception:
         expr = None
 
@@ -379,12 +1145,7 @@ def calc_steps(problem_str: str, solution: sp.Expr, calc_kind: str) -> str:
     step_num = 3
     results = []
     for t in terms:
-        if calc_kind == "Derivative":
-            result = sp.diff(t, x)
-        else:
-            result = sp.integrate(t, x)
-
-        rule = _identify_rule(t, x, calc_kind)
+        result, rule = _calc_term(t, x, calc_kind)
         lines.append("")
         lines.append(f"Step {step_num} ▸ {rule}")
         lines.append(f"   {t}  →  {result}")
@@ -394,8 +1155,13 @@ def calc_steps(problem_str: str, solution: sp.Expr, calc_kind: str) -> str:
     # Last: add everything back together
     lines.append("")
     lines.append(f"Step {step_num} ▸ Combine results")
-    combined = sum(results)
-    simplified = sp.simplify(combined)
+    combined = sp.Add(*results)
+    # the caller already knows the answer; if the terms add up to it, show that
+    try:
+        same = solution is not None and sp.expand(combined) == sp.expand(solution)
+    except Exception:
+        same = False
+    simplified = solution if same else _timed("simplify", sp.simplify, combined)
     lines.append(f"   = {simplified}")
 
     if calc_kind == "Integral":
@@ -406,6 +1172,22 @@ def calc_steps(problem_str: str, solution: sp.Expr, calc_kind: str) -> str:
     return "\n".join(lines)
 
 
+def _calc_term(term: sp.Expr, x: sp.Symbol, calc_kind: str):
+    """(derivative or integral of term, rule label), cached across calls."""
+    key = (term, calc_kind)
+    cached = _TERM_CACHE.get(key)
+    if cached is not _MISSING:
+        return cached
+
+    if calc_kind == "Derivative":
+        result = _timed("diff", sp.diff, term, x)
+    else:
+        result = _timed("integrate", sp.integrate, term, x)
+    value = (result, _identify_rule(term, x, calc_kind))
+    _TERM_CACHE.put(key, value)
+    return value
+
+
 def _identify_rule(term: sp.Expr, x: sp.Symbol, calc_kind: str) -> str:
     """Give a short label for what rule we're using on this term."""
     action = "Differentiate" if calc_kind == "Derivative" else "Integrate"
@@ -443,3 +1225,214 @@ def _identify_rule(term: sp.Expr, x: sp.Symbol, calc_kind: str) -> str:
         return f"{action} logarithm term  (d/dx ln(x) = 1/x)"
 
     return f"{action} this term"
+
+
+# problem sessions
+#
+# The functions above take a problem string and start from scratch every
+# time. A ProblemSession holds on to one problem and works things out the
+# first time they're asked for: the parsed equation, the solutions and
+# answer string (per target variable), and the step text. Checking the
+# same problem again, or showing its steps after a check, reuses them.
+
+class ProblemSession:
+    """One algebra or calculus problem, with its work cached as it's done.
+
+    For algebra, pass num_variables (1 or 2). For calculus, pass the
+    generator's solution and calc_kind ("Derivative" or "Integral").
+    Safe to share between threads.
+    """
+
+    def __init__(self, problem: str, num_variables: int = 1, *,
+                 solution: sp.Expr | None = None, calc_kind: str | None = None):
+        self.problem = problem
+        self.num_variables = num_variables
+        self.solution = solution
+        self.calc_kind = calc_kind
+        self._lock = threading.RLock()
+        self._parsed = None
+        self._solutions: dict[str | None, list] = {}
+        self._steps: dict[str | None, str] = {}
+
+    def __repr__(self) -> str:
+        return f"ProblemSession({self.problem!r})"
+
+    @property
+    def is_calculus(self) -> bool:
+        return self.calc_kind is not None
+
+    @property
+    def parsed(self):
+        """(equation, symbol_list), like _parse_equation; (None, []) if it won't parse."""
+        with self._lock:
+            if self._parsed is None:
+                self._parsed = _parse_equation(self.problem)
+            eq, syms = self._parsed
+            return eq, list(syms)
+
+    def solutions(self, solve_for: str | None = None) -> list:
+        """solve_algebra's answer for this problem (a list of solution dicts)."""
+        if self.is_calculus:
+            return []
+        with self._lock:
+            sols = self._solutions.get(solve_for)
+            if sols is None:
+                # only a parse we already have: linear problems never need one
+                sols = self._solutions[solve_for] = _solve_problem(self.problem, solve_for,
+                                                                   self._parsed)
+            return [dict(sol) for sol in sols]
+
+    def answer_display(self, solve_for: str | None = None) -> str:
+        """The correct answer as shown in feedback, like "x = 2  or  x = 3"."""
+        if self.is_calculus:
+            return sp.pretty(self.solution, use_unicode=True)
+        return format_solutions(self.solutions(solve_for))
+
+    def check(self, user_input: str, solve_for: str | None = None):
+        """check_algebra_answer / check_calc_answer for this problem."""
+        if self.is_calculus:
+            return check_calc_answer(user_input, self.solution)
+        if not user_input.strip():
+            return None, "Please enter an answer."
+
+        quick = _timed("linear", check_linear_answer, self.problem, user_input,
+                       self.num_variables, solve_for)
+        if quick is not None:
+            return quick
+
+        solutions = self.solutions(solve_for)
+        if not solutions:
+            return None, _NO_SOLUTION
+        syms = None
+        if self.num_variables != 1:
+            eq, syms = self.parsed
+            if eq is None:
+                return None, "Couldn't parse the problem."
+        return _grade_algebra(user_input, self.num_variables, solve_for, solutions,
+                              self.answer_display(solve_for), syms)
+
+    def steps(self, solve_for: str | None = None) -> str:
+        """algebra_steps / calc_steps for this problem, worked out once per target."""
+        with self._lock:
+            text = self._steps.get(solve_for)
+            if text is None:
+                text = self._steps[solve_for] = self._make_steps(solve_for)
+            return text
+
+    def cached_steps(self, solve_for: str | None = None) -> str | None:
+        """The step text if we've already made it, else None (never computes)."""
+        return self._steps.get(solve_for)
+
+    def _make_steps(self, solve_for: str | None) -> str:
+        if self.is_calculus:
+            return calc_steps(self.problem, self.solution, self.calc_kind)
+        return _algebra_steps(self.problem, self.num_variables, solve_for, self._parsed,
+                              self._solutions.get(solve_for))
+
+
+# batch grading
+#
+# solve_many / check_many spread the work over a process pool. Results come
+# back in input order as soon as they're ready, one (result, error) pair per
+# item, so one bad problem doesn't sink the whole batch.
+
+def _solve_task(item, timeout=None):
+    if isinstance(item, tuple) and not isinstance(item, Problem):
+        problem, solve_for = item
+    else:
+        problem, solve_for = item, None
+    try:
+        return solve_algebra(problem, solve_for=solve_for, timeout=timeout), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def _check_task(item, timeout=None):
+    problem, user_input, num_variables, *rest = item
+    solve_for = rest[0] if rest else None
+    try:
+        return check_algebra_answer(problem, user_input, num_variables,
+                                    solve_for=solve_for, timeout=timeout), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def _warm_up() -> None:
+    """Run each kind of call once so SymPy's solving code is loaded.
+
+    Pool workers run this first. Calls with a budget fork a child from the
+    worker, and whatever the child loads is thrown away with it, so without
+    this every budgeted call starts cold (about 4x slower).
+    """
+    check_algebra_answer("x^2 + 1 = 5", "2, -2", 1)
+    algebra_steps("x^2 + 1 = 5", 1)
+    check_calc_answer("2*x + cos(x)", sp.sympify("2*x + cos(x)"))
+
+
+def _run_chunk(task, chunk):
+    return [task(item) for item in chunk]
+
+
+def worker_pool(workers: int | None = None):
+    """A ProcessPoolExecutor for solver work.
+
+    Its workers are forked where the platform allows (cheap to start, and
+    they keep our caches) and warmed up before their first job. run_many,
+    solve_many and check_many use one; server.py keeps one for its requests.
+    """
+    from concurrent.futures import ProcessPoolExecutor   # not needed at startup
+
+    return ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1,
+                               mp_context=_mp_context(), initializer=_warm_up)
+
+
+def run_many(task, items, workers: int | None = None, chunksize: int = 8):
+    """Yield task(item) for each item, in order, over a worker_pool.
+
+    task must be picklable (a module-level function or a partial of one).
+    workers defaults to the CPU count; with 1 everything runs right here.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1:
+        for item in items:
+            yield task(item)
+        return
+
+    from collections import deque
+    from itertools import islice
+
+    items = iter(items)
+    with worker_pool(workers) as pool:
+        # pool.map would read every item up front; keeping a couple of chunks
+        # per worker in flight is enough to keep them busy and means a
+        # stream of any length (like stdin) is read as we go
+        pending = deque()
+        while chunk := list(islice(items, chunksize)):
+            pending.append(pool.submit(_run_chunk, task, chunk))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def solve_many(problems, workers: int | None = None, chunksize: int = 8,
+               timeout: float | None = None):
+    """solve_algebra over many problems, using every core.
+
+    Each problem is a string, a Problem or a (problem, solve_for) tuple.
+    Yields one (solutions, error) pair per problem in the same order; error
+    is None unless that problem raised. timeout is a per-problem budget.
+    """
+    return run_many(partial(_solve_task, timeout=timeout), problems, workers, chunksize)
+
+
+def check_many(pairs, workers: int | None = None, chunksize: int = 8,
+               timeout: float | None = None):
+    """check_algebra_answer over many submissions, using every core.
+
+    Each item is (problem, user_input, num_variables) with an optional
+    solve_for on the end. Yields ((is_correct, message), error) pairs in
+    the same order as the input. timeout is a per-submission budget.
+    """
+    return run_many(partial(_check_task, timeout=timeout), pairs, workers, chunksize)
@@ -0,0 +1,65 @@
+# test_mathparse.py — the syntax table at the top of mathparse.py
+#
+# Run with: python -m pytest -q
+
+import pytest
+import sympy as sp
+
+from mathparse import ParseError, calc_constants, parse_equation, parse_expr
+from solver import check_algebra_answer
+
+x, y = sp.symbols("x y")
+
+
+@pytest.mark.parametrize("text, expected", [
+    # implicit multiplication
+    ("3x", 3 * x),
+    ("2(x + 1)", 2 * (x + 1)),
+    ("(x)(y)", x * y),
+    ("x√2", x * sp.sqrt(2)),
+    # powers, right-associative and above unary minus
+    ("x^2", x**2),
+    ("x**2", x**2),
+    ("2^3^2", sp.Integer(2)**9),
+    ("-x^2", -x**2),
+    # square root of the next factor
+    ("√16", sp.Integer(4)),
+    ("√x", sp.sqrt(x)),
+    ("√16x", 4 * x),
+    # function names
+    ("sin(2x)", sp.sin(2 * x)),
+    ("ln(x)", sp.log(x)),
+    ("2cos(x) + tan(x)", 2 * sp.cos(x) + sp.tan(x)),
+    ("exp(x) - log(x) + sqrt(x)", sp.exp(x) - sp.log(x) + sp.sqrt(x)),
+    # constants
+    ("pi", sp.pi),
+    ("2pi", 2 * sp.pi),
+    ("I", sp.I),
+    ("3 + 2I", 3 + 2 * sp.I),
+    # single-letter variables
+    ("x y", x * y),
+    ("x*y", x * y),
+    ("2.5x", sp.Float("2.5") * x),
+])
+def test_syntax_table(text, expected):
+    assert parse_expr(text) == expected
+
+
+def test_e_is_only_a_constant_when_asked():
+    assert parse_expr("e") == sp.Symbol("e")
+    assert parse_expr("e^x", calc_constants()) == sp.exp(x)
+
+
+@pytest.mark.parametrize("text", ["sec(x)", "cot(x)", "abs(x)", "xy", "2sinx", "3x +", "x $ 2", ""])
+def test_bad_input_raises(text):
+    with pytest.raises(ParseError):
+        parse_expr(text)
+
+
+def test_parse_equation_lists_variables_in_order():
+    lhs, rhs, symbols = parse_equation("2y + x = 3")
+    assert (lhs, rhs, symbols) == (2 * y + x, 3, [y, x])
+
+
+def test_complex_answers():
+    assert check_algebra_answer("x^2 + 1 = 0", "I, -I", 1)[0] is True